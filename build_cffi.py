@@ -1,9 +1,22 @@
 """Build the C code with CFFI."""
 
+# setuptools must be imported before distutils, so that we get its vendored copy.
+import setuptools  # noqa: F401  # isort: skip
+
+import hashlib
+import json
 import os
+import platform
+import shlex
+import shutil
 import sys
 import sysconfig
+import tempfile
 from cffi import FFI
+from concurrent.futures import ThreadPoolExecutor
+from distutils import ccompiler
+from distutils import sysconfig as dist_sysconfig
+from distutils.errors import CompileError, LinkError
 
 # Get the compiler. We support gcc and clang.
 _compiler = sysconfig.get_config_var("CC")
@@ -21,11 +34,32 @@ LOCATION = os.path.dirname(os.path.abspath(__file__))
 CLOC = os.path.join(LOCATION, "src", "py21cmfast", "src")
 include_dirs = [CLOC]
 
-c_files = [
-    os.path.join("src", "py21cmfast", "src", f)
-    for f in os.listdir(CLOC)
-    if f.endswith(".c")
-]
+# Largest files first, so that a parallel build doesn't end up waiting on a big file
+# that was started last.
+c_files = sorted(
+    (
+        os.path.join("src", "py21cmfast", "src", f)
+        for f in os.listdir(CLOC)
+        if f.endswith(".c")
+    ),
+    key=lambda f: -os.path.getsize(os.path.join(LOCATION, f)),
+)
+
+library_dirs = []
+for k, v in os.environ.items():
+    if k == "CBLAS_LIB":
+        # This is a library *name*, handled below.
+        continue
+    elif "inc" in k.lower():
+        include_dirs += [v]
+    elif "lib" in k.lower():
+        library_dirs += [v]
+
+# Installation prefixes of optimized BLAS libraries.
+for k in ("OPENBLAS_DIR", "BLIS_DIR"):
+    if k in os.environ:
+        include_dirs += [os.path.join(os.environ[k], "include")]
+        library_dirs += [os.path.join(os.environ[k], "lib")]
 
 # Set the C-code logging level.
 # If DEBUG is set, we default to the highest level, but if not,
@@ -54,23 +88,146 @@ except ValueError:
         "of {}".format(available_levels)
     )
 
+
+def _can_link(symbol=None, libraries=(), extra_args=()):
+    """Check whether a program calling ``symbol`` links against ``libraries``.
+
+    Any ``extra_args`` are passed both when compiling and linking the test program.
+    If ``symbol`` is None, only check that a trivial program can be built.
+    """
+    cc = ccompiler.new_compiler()
+    dist_sysconfig.customize_compiler(cc)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "probe.c")
+        with open(src, "w") as fl:
+            if symbol is None:
+                fl.write("int main(void){ return 0; }\n")
+            else:
+                fl.write(f"char {symbol}(void);\n")
+                fl.write(f"int main(void){{ return (int) {symbol}(); }}\n")
+
+        try:
+            objects = cc.compile(
+                [src], output_dir=tmpdir, extra_postargs=list(extra_args)
+            )
+            cc.link_executable(
+                objects,
+                os.path.join(tmpdir, "probe"),
+                libraries=list(libraries),
+                library_dirs=library_dirs,
+                extra_postargs=list(extra_args),
+            )
+        except (CompileError, LinkError):
+            return False
+
+    return True
+
+
 # ==================================================
 # Set compilation arguments dependent on environment
 # ==================================================
 
-extra_compile_args = ["-Wall", "--verbose", f"-DLOG_LEVEL={log_level:d}"]
+extra_compile_args = ["-Wall", f"-DLOG_LEVEL={log_level:d}"]
+
+if "PY21CMFAST_VERBOSE" in os.environ:
+    extra_compile_args += ["--verbose"]
 
 if "DEBUG" in os.environ:
     extra_compile_args += ["-g", "-O0"]
 else:
-    extra_compile_args += ["-Ofast"]
+    # -Ofast implies -ffast-math, whose finite-math assumptions break NaN/Inf handling,
+    # so we only use the subset of it that is safe for our numerics.
+    extra_compile_args += [
+        "-O3",
+        "-fno-math-errno",
+        "-fno-signed-zeros",
+        "-fno-trapping-math",
+        "-funroll-loops",
+    ]
+
+    # Target the host CPU, so that the hot loops can use AVX2/AVX-512/FMA. Set
+    # PY21CMFAST_PORTABLE=1 when building binaries that must run on other machines,
+    # or PY21CMFAST_MARCH to target a specific ISA level (e.g. x86-64-v3).
+    is_x86 = platform.machine().lower() in ("x86_64", "amd64")
+    march = os.environ.get("PY21CMFAST_MARCH")
+    if march is None and os.environ.get("PY21CMFAST_PORTABLE") != "1" and is_x86:
+        march = "native"
+
+    if march:
+        extra_compile_args += [f"-march={march}"]
+        if march == "native":
+            extra_compile_args += ["-mtune=native"]
+        if is_x86:
+            extra_compile_args += ["-mprefer-vector-width=256"]
+
+# Setting PY21CMFAST_NO_OPENMP=1 gives serial binaries (useful for benchmarking). The
+# OpenMP runtime is still linked, since the C code calls its API functions directly.
+# Either way, -fopenmp-simd is used so that `omp simd` loops are still vectorized.
+use_openmp = os.environ.get("PY21CMFAST_NO_OPENMP") != "1"
+
+if use_openmp:
+    if sys.platform == "darwin":
+        extra_compile_args += ["-Xpreprocessor"]
+
+    extra_compile_args += ["-fopenmp"]
+
+extra_compile_args += ["-fopenmp-simd"]
 
-if sys.platform == "darwin":
-    extra_compile_args += ["-Xpreprocessor"]
+# Only the module init function (marked for export by Python's PyMODINIT_FUNC) needs to
+# be visible outside the shared library; CFFI accesses everything else internally.
+# Hiding all other symbols avoids PLT/GOT indirection for calls between the C files.
+extra_compile_args += ["-fvisibility=hidden"]
 
-extra_compile_args += ["-fopenmp"]
+# Link-time optimization lets the compiler inline calls across the C files.
+extra_link_args = []
+use_lto = "DEBUG" not in os.environ and os.environ.get("PY21CMFAST_NO_LTO") != "1"
+lto_flag = "-flto=thin" if compiler == "clang" else "-flto=auto"
+lto_args = [lto_flag] if use_lto else []
 
-libraries = ["m", "gsl", "gslcblas", "fftw3f_omp", "fftw3f"]
+# Use a faster (multi-threaded) linker than the default BFD ld if one is available,
+# unless the user has chosen one themselves. lld can't link GCC's LTO objects, so with
+# gcc only mold is used. We check that the linker works with our link flags first.
+if "-fuse-ld" not in os.environ.get("LDFLAGS", ""):
+    for linker, exe in (("mold", "mold"), ("lld", "ld.lld")):
+        if compiler == "gcc" and linker == "lld":
+            continue
+
+        fuse_ld = [f"-fuse-ld={linker}"]
+        if shutil.which(exe) and _can_link(extra_args=lto_args + fuse_ld):
+            extra_link_args += fuse_ld
+            break
+
+# Not every toolchain can link LTO objects (e.g. clang's thin LTO with GNU ld needs the
+# LLVMgold plugin), so LTO is only used if it works with the chosen linker. The OpenMP
+# flag must also be passed at link time, since code generation happens then.
+if use_lto and _can_link(extra_args=lto_args + extra_link_args):
+    extra_compile_args += lto_args
+    extra_link_args += lto_args
+
+    if use_openmp and compiler == "gcc":
+        extra_link_args += ["-fopenmp"]
+
+# Any user-specified flags come last, so that they take precedence over ours.
+extra_compile_args += shlex.split(os.environ.get("EXTRA_CFLAGS", ""))
+
+# FFTW can be threaded with either OpenMP or pthreads. We prefer the OpenMP backend
+# (which shares its thread pool with the rest of the C code), but not every FFTW
+# installation provides it, so fall back to the pthreads one if it can't be linked.
+fftw_threads = "fftw3f_omp"
+if not _can_link("fftwf_init_threads", [fftw_threads, "fftw3f"]) and _can_link(
+    "fftwf_init_threads", ["fftw3f_threads", "fftw3f"]
+):
+    fftw_threads = "fftw3f_threads"
+
+# GSL needs a CBLAS implementation. By default we use OpenBLAS if it is available,
+# falling back to GSL's own (unoptimized) reference implementation. Any other CBLAS
+# (e.g. blis) can be chosen explicitly with CBLAS_LIB.
+cblas_lib = os.environ.get("CBLAS_LIB")
+if cblas_lib is None:
+    cblas_lib = "openblas" if _can_link("cblas_sgemm", ["openblas"]) else "gslcblas"
+
+libraries = ["m", "gsl", cblas_lib, fftw_threads, "fftw3f"]
 
 # stuff for gperftools
 if "PROFILE" in os.environ:
@@ -80,13 +237,63 @@ if "PROFILE" in os.environ:
 
 if compiler == "clang":
     libraries += ["omp"]
+elif not use_openmp:
+    libraries += ["gomp"]
 
-library_dirs = []
-for k, v in os.environ.items():
-    if "inc" in k.lower():
-        include_dirs += [v]
-    elif "lib" in k.lower():
-        library_dirs += [v]
+# Use a compiler cache (ccache/sccache) if one is available, so that unchanged
+# translation units are not recompiled on every re-install. The cache is keyed on the
+# preprocessed source and the compile flags, so it is always safe to use.
+if "PY21CMFAST_NO_CCACHE" not in os.environ:
+    _launcher = shutil.which("ccache") or shutil.which("sccache")
+    _cc = os.environ.get("CC", _compiler)
+    if _launcher and os.path.basename(_cc.split()[0]) not in ("ccache", "sccache"):
+        os.environ["CC"] = f"{_launcher} {_cc}"
+
+# ======================================================
+# Parallel compilation of the C sources (opt-in)
+# ======================================================
+# setuptools only parallelizes *across* extensions, but we have a single extension
+# made up of many translation units. If PY21CMFAST_BUILD_JOBS is set to more than one
+# job, we patch the compiler so that the individual sources are compiled concurrently.
+build_jobs = os.environ.get("PY21CMFAST_BUILD_JOBS", "1")
+try:
+    build_jobs = os.cpu_count() if build_jobs.lower() == "auto" else int(build_jobs)
+except ValueError:
+    raise ValueError(
+        f"PY21CMFAST_BUILD_JOBS must be a positive integer or 'auto', got {build_jobs}"
+    )
+
+
+def _parallel_compile(
+    self,
+    sources,
+    output_dir=None,
+    macros=None,
+    include_dirs=None,
+    debug=0,
+    extra_preargs=None,
+    extra_postargs=None,
+    depends=None,
+):
+    """Compile sources concurrently. Drop-in replacement for ``CCompiler.compile``."""
+    macros, objects, extra_postargs, pp_opts, build = self._setup_compile(
+        output_dir, macros, include_dirs, sources, depends, extra_postargs
+    )
+    cc_args = self._get_cc_args(pp_opts, debug, extra_preargs)
+
+    def _compile_one(obj):
+        src, ext = build[obj]
+        self._compile(obj, src, ext, cc_args, extra_postargs, pp_opts)
+
+    with ThreadPoolExecutor(max_workers=build_jobs) as pool:
+        # list() so that any compilation error is raised here.
+        list(pool.map(_compile_one, [obj for obj in objects if obj in build]))
+
+    return objects
+
+
+if build_jobs > 1:
+    ccompiler.CCompiler.compile = _parallel_compile
 
 # =================================================================
 # NOTES FOR DEVELOPERS:
@@ -103,6 +310,7 @@ for k, v in os.environ.items():
 ffi.set_source(
     "py21cmfast.c_21cmfast",  # Name/Location of shared library module
     """
+    #include <fftw3.h>
     #include "21cmFAST.h"
     """,
     sources=c_files,
@@ -110,15 +318,21 @@ ffi.set_source(
     library_dirs=library_dirs,
     libraries=libraries,
     extra_compile_args=extra_compile_args,
+    extra_link_args=extra_link_args,
 )
 
-# Header files containing types, globals and function prototypes
-with open(os.path.join(CLOC, "_inputparams_wrapper.h")) as f:
-    ffi.cdef(f.read())
-with open(os.path.join(CLOC, "_outputstructs_wrapper.h")) as f:
-    ffi.cdef(f.read())
-with open(os.path.join(CLOC, "_functionprototypes_wrapper.h")) as f:
-    ffi.cdef(f.read())
+# Header files containing types, globals and function prototypes. These are passed
+# to a single cdef() call, so that the C parser only has to be run once.
+cdef_headers = []
+for header in (
+    "_inputparams_wrapper.h",
+    "_outputstructs_wrapper.h",
+    "_functionprototypes_wrapper.h",
+):
+    with open(os.path.join(CLOC, header)) as f:
+        cdef_headers.append(f.read())
+
+ffi.cdef("\n".join(cdef_headers))
 
 # CFFI needs to be able to access a free function to make the __del__ method for OutputStruct fields
 #  This will expose the standard free() function to the wrapper so it can be used
@@ -128,5 +342,62 @@ ffi.cdef(
     """
 )
 
+# Expose FFTW's thread initialisation, so that the number of threads used by the FFT
+# planner can be controlled from the wrapper, and its wisdom I/O, so that plans can be
+# persisted and re-loaded from the wrapper.
+ffi.cdef(
+    """
+        int fftwf_init_threads(void);
+        void fftwf_plan_with_nthreads(int nthreads);
+
+        int fftwf_import_wisdom_from_filename(const char *filename);
+        int fftwf_export_wisdom_to_filename(const char *filename);
+        void fftwf_forget_wisdom(void);
+    """
+)
+
+
+def _build_hash():
+    """Hash the state of everything that determines the compiled library.
+
+    Only file metadata (not contents) is used, so that this is a cheap, stat-only
+    operation.
+    """
+    key = hashlib.sha256()
+    headers = [os.path.join(CLOC, f) for f in os.listdir(CLOC) if f.endswith(".h")]
+    for fname in sorted(c_files + headers):
+        stat = os.stat(fname)
+        key.update(f"{fname}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+
+    # CC includes the compiler cache launcher, if one is used.
+    options = (
+        os.environ.get("CC"),
+        extra_compile_args,
+        extra_link_args,
+        libraries,
+        include_dirs,
+        library_dirs,
+    )
+    key.update(repr(options).encode())
+    return key.hexdigest()
+
+
 if __name__ == "__main__":
-    ffi.compile()
+    # Skip re-compilation if nothing has changed since the last build in this directory.
+    hash_file = ".c_21cmfast.buildhash"
+    build_hash = _build_hash()
+
+    previous = {}
+    if os.path.exists(hash_file):
+        with open(hash_file) as fl:
+            previous = json.load(fl)
+
+    if previous.get("hash") == build_hash and os.path.exists(
+        previous.get("output", "")
+    ):
+        msg = f"{previous['output']} is up to date, skipping compilation."
+        print(msg)  # noqa: T201
+    else:
+        output = ffi.compile()
+        with open(hash_file, "w") as fl:
+            json.dump({"hash": build_hash, "output": output}, fl)
@@ -0,0 +1,19 @@
+"""In-memory caching of the results of expensive calls within a process."""
+
+
+class FIFOCache(dict):
+    """A dict that holds at most ``maxsize`` items, dropping the oldest first.
+
+    This is used for module-level caches whose keys are not (all) arguments of a
+    single function, or are only sometimes hashable, so that
+    :func:`functools.lru_cache` does not fit.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key, value):
+        if key not in self and len(self) >= self.maxsize:
+            del self[next(iter(self))]
+        super().__setitem__(key, value)
@@ -174,7 +174,7 @@ class _HighLevelOutput:
             hash=md5((self._input_rep() + self._particular_rep()).encode()).hexdigest()
         )
 
-    def _write(self, direc=None, fname=None, clobber=False):
+    def _write(self, direc=None, fname=None, clobber=False, **particulars_kw):
         """
         Write the high level output to file in standard HDF5 format.
 
@@ -191,6 +191,8 @@ class _HighLevelOutput:
             The filename to write, default a unique name produced by the inputs.
         clobber : bool, optional
             Whether to overwrite existing file.
+        particulars_kw
+            Any further options are passed through to ``_write_particulars``.
 
         Returns
         -------
@@ -210,6 +212,10 @@ class _HighLevelOutput:
                 f"The file {fname} already exists. If you want to overwrite, set clobber=True."
             )
 
+        # Opening the file for writing truncates it, so anything still to be read
+        # from it must be read now.
+        self._load_from_file(fname)
+
         with h5py.File(fname, "w") as f:
             # Save input parameters as attributes
             for k in [
@@ -241,10 +247,14 @@ class _HighLevelOutput:
             f.attrs["random_seed"] = self.random_seed
             f.attrs["version"] = __version__
 
-        self._write_particulars(fname)
+        self._write_particulars(fname, **particulars_kw)
 
         return fname
 
+    def _load_from_file(self, fname):
+        """Read any data that is still only held in the file ``fname``."""
+        pass
+
     def _write_particulars(self, fname):
         pass
 
@@ -596,10 +606,11 @@ def run_coeval(
 
     # We can go ahead and purge some of the stuff in the initial_conditions, but only if
     # it is cached -- otherwise we could be losing information.
-    with contextlib.suppress(OSError):
-        initial_conditions.prepare_for_perturb(
-            flag_options=inputs.flag_options, force=always_purge
-        )
+    if always_purge or initial_conditions.is_cached:
+        with contextlib.suppress(OSError):
+            initial_conditions.prepare_for_perturb(
+                flag_options=inputs.flag_options, force=always_purge
+            )
 
     if out_redshifts is not None and not hasattr(out_redshifts, "__len__"):
         singleton = True
@@ -671,10 +682,11 @@ def run_coeval(
         pt_halos = pt_halos[::-1]
 
     # Now we can purge initial_conditions further.
-    with contextlib.suppress(OSError):
-        initial_conditions.prepare_for_spin_temp(
-            flag_options=inputs.flag_options, force=always_purge
-        )
+    if always_purge or initial_conditions.is_cached:
+        with contextlib.suppress(OSError):
+            initial_conditions.prepare_for_spin_temp(
+                flag_options=inputs.flag_options, force=always_purge
+            )
     if (
         inputs.flag_options.PHOTON_CONS_TYPE == "z-photoncons"
         and np.amin(all_redshifts) < global_params.PhotonConsEndCalibz
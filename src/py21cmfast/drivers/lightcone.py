@@ -3,19 +3,25 @@
 import contextlib
 import h5py
 import logging
+import math
+import multiprocessing
 import numpy as np
 import os
+import tempfile
 import warnings
 from astropy import units
-from astropy.cosmology import z_at_value
 from collections import deque
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from cosmotile import apply_rsds
+from functools import cached_property
+from itertools import repeat
 from pathlib import Path
 from typing import Sequence
 
-from ..c_21cmfast import lib
+from ..c_21cmfast import ffi, lib
 from ..cache_tools import get_boxes_at_redshift
-from ..lightcones import Lightconer, RectilinearLightconer
+from ..lightcones import Lightconer, RectilinearLightconer, _redshifts_at_distances
 from ..wrapper.globals import global_params
 from ..wrapper.inputs import AstroParams, CosmoParams, FlagOptions, UserParams
 from ..wrapper.outputs import InitialConditions, PerturbedField
@@ -27,6 +33,86 @@ from .single_field import set_globals
 
 logger = logging.getLogger(__name__)
 
+# Target size of a single HDF5 chunk of a saved lightcone.
+_LC_CHUNK_BYTES = 2 * 1024**2
+
+# Compression of saved lightcones. LZF is cheap, ships with h5py (so files can be
+# read anywhere h5py is installed), and the lightcone fields compress well.
+_LC_COMPRESSION = {"compression": "lzf", "shuffle": True}
+
+
+def _lightcone_chunks(shape: tuple[int, ...], itemsize: int) -> tuple[int, ...]:
+    """Get the HDF5 chunk shape to use for a lightcone of a given shape.
+
+    Lightcones are filled (and checkpointed) a few slices along the last axis at a
+    time, so each chunk spans the full transverse extent and as many slices as fit
+    in roughly ``_LC_CHUNK_BYTES``.
+    """
+    slice_bytes = int(np.prod(shape[:-1])) * itemsize
+    depth = min(shape[-1], max(1, _LC_CHUNK_BYTES // slice_bytes))
+    return (*shape[:-1], depth)
+
+
+def _zeros_lightcone(shape: tuple[int, ...], direc: Path | None = None) -> np.ndarray:
+    """Allocate a zeroed (float32) lightcone array.
+
+    If ``direc`` is given, the array is memory-mapped onto an anonymous temporary
+    file in that directory, so that the OS can write its pages back and drop them
+    from RAM, rather than the full lightcone being held in memory. The file is
+    removed once the array is no longer used.
+    """
+    if direc is None:
+        return np.zeros(shape, dtype=np.float32)
+
+    with tempfile.TemporaryFile(dir=direc) as fl:
+        return np.memmap(fl, dtype=np.float32, mode="w+", shape=shape)
+
+
+class _LazyLightcones(MutableMapping):
+    """A mapping of lightcone arrays that are only read from file when first accessed.
+
+    Values set explicitly are held in memory as usual. The file must still exist
+    (and be unchanged) when a (not yet read) lightcone is accessed, so anything
+    overwriting it must first call :meth:`load_all`.
+    """
+
+    def __init__(self, fname, shapes: dict[str, tuple[int, ...]]):
+        self._fname = fname
+        self.shapes = shapes
+        self._data = dict.fromkeys(shapes)
+
+    def __getitem__(self, key):
+        if self._data[key] is None:
+            with h5py.File(self._fname, "r") as fl:
+                self._data[key] = fl["lightcones"][key][...]
+        return self._data[key]
+
+    def load_all(self):
+        """Read all the lightcones that have not yet been read from file."""
+        unread = [k for k, v in self._data.items() if v is None]
+        if unread:
+            with h5py.File(self._fname, "r") as fl:
+                for k in unread:
+                    self._data[k] = fl["lightcones"][k][...]
+
+    def __contains__(self, key):
+        # Mapping's default would read the lightcone just to check it's there.
+        return key in self._data
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self.shapes[key] = value.shape
+
+    def __delitem__(self, key):
+        del self._data[key]
+        del self.shapes[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
 
 class LightCone(_HighLevelOutput):
     """A full Lightcone with all associated evolved data."""
@@ -73,14 +159,24 @@ class LightCone(_HighLevelOutput):
 
         self.photon_nonconservation_data = photon_nonconservation_data
 
-        for name, data in lightcones.items():
-            setattr(self, name, data)
-
         # Hold a reference to the global/lightcones in a dict form for easy reference.
         self.global_quantities = global_quantities
         self.lightcones = lightcones
         self._current_index = current_index or self.shape[-1] - 1
 
+        # An open handle to the checkpoint file, see open_checkpoint().
+        self._checkpoint_file = None
+
+    def __getattr__(self, name):
+        """Get lightcone fields as attributes (e.g. ``lightcone.brightness_temp``)."""
+        # Look in the instance dict directly, to avoid recursion before it is set up.
+        lightcones = self.__dict__.get("lightcones", {})
+        if name in lightcones:
+            return lightcones[name]
+
+        # Re-raise the original error (which may have come from a property).
+        return object.__getattribute__(self, name)
+
     @property
     def global_xHI(self):
         """Global neutral fraction function."""
@@ -106,7 +202,11 @@ class LightCone(_HighLevelOutput):
     @property
     def shape(self):
         """Shape of the lightcone as a 3-tuple."""
-        return self.lightcones[list(self.lightcones.keys())[0]].shape
+        key = next(iter(self.lightcones))
+        if isinstance(self.lightcones, _LazyLightcones):
+            # Don't read a lightcone just to get its shape.
+            return self.lightcones.shapes[key]
+        return self.lightcones[key].shape
 
     @property
     def n_slices(self):
@@ -118,14 +218,11 @@ class LightCone(_HighLevelOutput):
         """Co-ordinates [Mpc] of each slice along the redshift axis."""
         return self.lightcone_distances - self.lightcone_distances[0]
 
-    @property
+    @cached_property
     def lightcone_redshifts(self):
         """Redshift of each cell along the redshift axis."""
-        return np.array(
-            [
-                z_at_value(self.cosmo_params.cosmo.comoving_distance, d)
-                for d in self.lightcone_distances
-            ]
+        return _redshifts_at_distances(
+            self.cosmo_params.cosmo, self.lightcone_distances.to_value(units.Mpc)
         )
 
     def _get_prefix(self):
@@ -143,14 +240,32 @@ class LightCone(_HighLevelOutput):
             + str(self.lightcones.keys())
         )
 
-    def _write_particulars(self, fname):
+    def _load_from_file(self, fname):
+        if (
+            isinstance(self.lightcones, _LazyLightcones)
+            and os.path.exists(fname)
+            and os.path.samefile(fname, self.lightcones._fname)
+        ):
+            self.lightcones.load_all()
+
+    def _write_particulars(self, fname, preallocate: bool = False):
         with h5py.File(fname, "a") as f:
             # Save the boxes to the file
             boxes = f.create_group("lightcones")
 
-            # Go through all fields in this struct, and save
+            # Go through all fields in this struct, and save. If preallocating, the
+            # datasets are only created at their full size (to be filled with zeros by
+            # HDF5 lazily), and their data is left to be written by make_checkpoint.
             for k, val in self.lightcones.items():
-                boxes[k] = val
+                boxes.create_dataset(
+                    k,
+                    shape=val.shape,
+                    dtype=val.dtype,
+                    data=None if preallocate else val,
+                    chunks=_lightcone_chunks(val.shape, val.itemsize),
+                    fillvalue=0,
+                    **_LC_COMPRESSION,
+                )
 
             global_q = f.create_group("global_quantities")
             for k, v in self.global_quantities.items():
@@ -161,15 +276,52 @@ class LightCone(_HighLevelOutput):
             f["log10_mturnovers"] = self.log10_mturnovers
             f["log10_mturnovers_mini"] = self.log10_mturnovers_mini
 
+    def _preallocate_hdf5(self, fname):
+        """Create a checkpoint file for this lightcone, without writing its data.
+
+        All the datasets are created at their final size, so that
+        :meth:`make_checkpoint` only ever has to write slabs into them. This is only
+        correct for a lightcone that has not yet been filled.
+        """
+        return self._write(direc=".", fname=fname, preallocate=True)
+
+    def open_checkpoint(self, fname):
+        """Keep a checkpoint file open for subsequent calls to :meth:`make_checkpoint`.
+
+        This avoids re-opening the file at every redshift. The file must be closed
+        with :meth:`close_checkpoint` once the lightcone is complete.
+        """
+        self.close_checkpoint()
+        # Make the chunk cache big enough to hold the (compressed) chunk currently
+        # being filled for every lightcone, so partial chunks aren't re-read.
+        self._checkpoint_file = h5py.File(
+            fname, "a", rdcc_nbytes=2 * _LC_CHUNK_BYTES * max(1, len(self.lightcones))
+        )
+
+    def close_checkpoint(self):
+        """Close the checkpoint file opened by :meth:`open_checkpoint`, if any."""
+        if self._checkpoint_file is not None:
+            self._checkpoint_file.close()
+            self._checkpoint_file = None
+
     def make_checkpoint(self, fname, index: int, redshift: float):
         """Write updated lightcone data to file."""
-        with h5py.File(fname, "a") as fl:
+        if self._checkpoint_file is not None and os.path.abspath(
+            self._checkpoint_file.filename
+        ) == os.path.abspath(fname):
+            fl_context = contextlib.nullcontext(self._checkpoint_file)
+        else:
+            fl_context = h5py.File(fname, "a")
+
+        with fl_context as fl:
             current_index = fl.attrs.get("current_index", 0)
 
+            # All lightcones share a shape, so they all get the same slab of slices.
+            n_slices = self.n_slices
+            start, stop, _ = slice(-index, n_slices - current_index).indices(n_slices)
+            lc_group = fl["lightcones"]
             for k, v in self.lightcones.items():
-                fl["lightcones"][k][..., -index : v.shape[-1] - current_index] = v[
-                    ..., -index : v.shape[-1] - current_index
-                ]
+                lc_group[k][..., start:stop] = v[..., start:stop]
 
             global_q = fl["global_quantities"]
             for k, v in self.global_quantities.items():
@@ -179,6 +331,7 @@ class LightCone(_HighLevelOutput):
 
             fl.attrs["current_index"] = index
             fl.attrs["current_redshift"] = redshift
+            fl.flush()
             self._current_redshift = redshift
             self._current_index = index
 
@@ -211,8 +364,12 @@ class LightCone(_HighLevelOutput):
     def _read_particular(cls, fname, safe=True):
         kwargs = {}
         with h5py.File(fname, "r") as fl:
+            # The lightcones themselves can be very large, so they are only read
+            # from the file when they are first accessed.
             boxes = fl["lightcones"]
-            kwargs["lightcones"] = {k: boxes[k][...] for k in boxes.keys()}
+            kwargs["lightcones"] = _LazyLightcones(
+                fname, {k: boxes[k].shape for k in boxes.keys()}
+            )
 
             glb = fl["global_quantities"]
             kwargs["global_quantities"] = {k: glb[k][...] for k in glb.keys()}
@@ -225,21 +382,26 @@ class LightCone(_HighLevelOutput):
 
     def __eq__(self, other):
         """Determine if this is equal to another object."""
+
+        def _redshifts_close(a, b):
+            return np.shape(a) == np.shape(b) and (
+                np.array_equal(a, b) or np.allclose(a, b, atol=1e-3)
+            )
+
+        # Cheap checks first, so that the redshift arrays (which may have to be
+        # computed) are only compared for otherwise-equal lightcones.
         return (
             isinstance(other, self.__class__)
             and other.random_seed == self.random_seed
-            and np.all(
-                np.isclose(
-                    other.lightcone_redshifts, self.lightcone_redshifts, atol=1e-3
-                )
-            )
-            and np.all(np.isclose(other.node_redshifts, self.node_redshifts, atol=1e-3))
+            and self.global_quantities.keys() == other.global_quantities.keys()
+            and self.lightcones.keys() == other.lightcones.keys()
+            and self.shape == other.shape
             and self.user_params == other.user_params
             and self.cosmo_params == other.cosmo_params
             and self.flag_options == other.flag_options
             and self.astro_params == other.astro_params
-            and self.global_quantities.keys() == other.global_quantities.keys()
-            and self.lightcones.keys() == other.lightcones.keys()
+            and _redshifts_close(self.node_redshifts, other.node_redshifts)
+            and _redshifts_close(self.lightcone_redshifts, other.lightcone_redshifts)
         )
 
 
@@ -276,43 +438,66 @@ class AngularLightcone(LightCone):
             )
             return self.lightcones["brightness_temp_with_rsds"]
 
-        H0 = self.cosmo_params.cosmo.H(self.lightcone_redshifts)
-        los_displacement = self.lightcones["los_velocity"] * units.Mpc / units.s / H0
+        zs = self.lightcone_redshifts
         equiv = units.pixel_scale(self.user_params.cell_size / units.pixel)
-        los_displacement = -los_displacement.to(units.pixel, equivalencies=equiv)
 
-        lcd = self.lightcone_distances.to(units.pixel, equiv)
+        # The LoS displacement in pixels is -v / H(z) / cell_size. Get the (per-slice)
+        # factor first, so that the velocity lightcone is only multiplied once,
+        # without any unit-tracking intermediate arrays.
+        pixels_per_velocity = -1.0 / (
+            self.cosmo_params.cosmo.H(zs).to_value(1 / units.s)
+            * self.user_params.cell_size.to_value(units.Mpc)
+        )
+        los_displacement = self.lightcones["los_velocity"] * pixels_per_velocity
+
+        lcd = self.lightcone_distances.to_value(units.pixel, equiv)
         dvdx_on_h = np.gradient(los_displacement, lcd, axis=1)
 
+        # We only need 1 + dv/dx from here on, so we re-use the gradient's buffer
+        # for it rather than allocating new full-size arrays.
         if not (self.flag_options.USE_TS_FLUCT and self.flag_options.SUBCELL_RSD):
             # Now, clip dvdx...
-            dvdx_on_h = np.clip(
+            np.clip(
                 dvdx_on_h,
                 -global_params.MAX_DVDR,
                 global_params.MAX_DVDR,
                 out=dvdx_on_h,
             )
+            gradient_component = dvdx_on_h
+            gradient_component += 1.0
 
-            tb_with_rsds = self.brightness_temp / (1 + dvdx_on_h)
+            tb_with_rsds = np.divide(self.brightness_temp, gradient_component)
         else:
-            gradient_component = 1 + dvdx_on_h  # not clipped!
+            gradient_component = dvdx_on_h
+            gradient_component += 1.0  # not clipped!
             Tcmb = 2.728
-            Trad = Tcmb * (1 + self.lightcone_redshifts)
-            tb_with_rsds = np.where(
-                gradient_component < 1e-7,
-                1000.0 * (self.Ts_box - Trad) / (1.0 + self.lightcone_redshifts),
-                (1.0 - np.exp(self.brightness_temp / gradient_component))
-                * 1000.0
-                * (self.Ts_box - Trad)
-                / (1.0 + self.lightcone_redshifts),
+            Trad = Tcmb * (1 + zs)
+
+            # Both branches share the 1000 (Ts - Trad) / (1 + z) prefactor, so build
+            # that once and multiply in the optical-depth factor in-place, rather
+            # than materialising both branches over the full volume.
+            tb_with_rsds = np.subtract(self.Ts_box, Trad)
+            tb_with_rsds *= 1000.0 / (1.0 + zs)
+
+            # The optical-depth factor only applies where the gradient is not
+            # vanishing, so only evaluate the (expensive) exponential there.
+            mask = gradient_component >= 1e-7
+            tau_factor = np.ones(gradient_component.shape)
+            np.divide(
+                self.brightness_temp, gradient_component, out=tau_factor, where=mask
             )
+            np.exp(tau_factor, out=tau_factor, where=mask)
+            np.subtract(1.0, tau_factor, out=tau_factor, where=mask)
+            tb_with_rsds *= tau_factor
 
-        # Compute the local RSDs
+        # Compute the local RSDs. The angular lightcones are 2D, so the transposes
+        # here are just views with swapped strides, and units are attached as
+        # views as well -- none of the inputs are copied.
         if n_subcells > 0:
             tb_with_rsds = apply_rsds(
                 field=tb_with_rsds.T,
-                los_displacement=los_displacement.T,
-                distance=self.lightcone_distances.to(units.pixel, equiv),
+                los_displacement=(los_displacement << units.pixel).T,
+                distance=lcd << units.pixel,
                 n_subcells=n_subcells,
             ).T
 
@@ -321,7 +506,14 @@ class AngularLightcone(LightCone):
         if fname:
             if Path(fname).exists():
                 with h5py.File(fname, "a") as fl:
-                    fl["lightcones"]["brightness_temp_with_rsds"] = tb_with_rsds
+                    fl["lightcones"].create_dataset(
+                        "brightness_temp_with_rsds",
+                        data=tb_with_rsds,
+                        chunks=_lightcone_chunks(
+                            tb_with_rsds.shape, tb_with_rsds.itemsize
+                        ),
+                        **_LC_COMPRESSION,
+                    )
             else:
                 self.save(fname)
 
@@ -334,6 +526,7 @@ def setup_lightcone_instance(
     inputs: InputParameters,
     global_quantities: Sequence[str],
     lightcone_filename: Path | None = None,
+    global_quantities_dtype: np.dtype = np.float64,
 ):
     """Returns a LightCone instance given a lightconer as input."""
     if lightcone_filename and Path(lightcone_filename).exists():
@@ -352,19 +545,22 @@ def setup_lightcone_instance(
             if isinstance(lightconer, RectilinearLightconer)
             else AngularLightcone
         )
+        # When minimizing memory, back the lightcones by disk next to the checkpoint
+        # file, which is already written as the lightcone is filled.
+        direc = (
+            Path(lightcone_filename).absolute().parent
+            if lightcone_filename and inputs.user_params.MINIMIZE_MEMORY
+            else None
+        )
+        shape = lightconer.get_shape(inputs.user_params)
         lc = {
-            quantity: np.zeros(
-                lightconer.get_shape(inputs.user_params),
-                dtype=np.float32,
-            )
+            quantity: _zeros_lightcone(shape, direc)
             for quantity in lightconer.quantities
         }
 
         # Special case: AngularLightconer can also save los_velocity
         if getattr(lightconer, "get_los_velocity", False):
-            lc["los_velocity"] = np.zeros(
-                lightconer.get_shape(inputs.user_params), dtype=np.float32
-            )
+            lc["los_velocity"] = _zeros_lightcone(shape, direc)
 
         lightcone = lcn_cls(
             lightconer.lc_distances,
@@ -373,7 +569,8 @@ def setup_lightcone_instance(
             log10_mturnovers=np.zeros_like(scrollz),
             log10_mturnovers_mini=np.zeros_like(scrollz),
             global_quantities={
-                quantity: np.zeros(len(scrollz)) for quantity in global_quantities
+                quantity: np.zeros(len(scrollz), dtype=global_quantities_dtype)
+                for quantity in global_quantities
             },
             _globals=dict(global_params.items()),
         )
@@ -388,8 +585,10 @@ def _run_lightcone_from_perturbed_fields(
     perturbed_fields: Sequence[PerturbedField],
     lightconer: Lightconer,
     inputs: InputParameters,
+    node_redshifts: Sequence[float] | None = None,
     regenerate: bool | None = None,
     global_quantities: tuple[str] = ("brightness_temp", "xH_box"),
+    global_quantities_dtype: np.dtype = np.float64,
     direc: Path | str | None = None,
     cleanup: bool = True,
     hooks: dict | None = None,
@@ -414,13 +613,23 @@ def _run_lightcone_from_perturbed_fields(
         These may be any of the quantities that can be used in ``lightcone_quantities``.
         The mean is taken over the full 3D cube at each redshift, rather than a 2D
         slice.
+    global_quantities_dtype : numpy dtype, optional
+        The dtype in which to store the global quantities. The means are always
+        computed in double precision, but as they are typically only used for
+        diagnostics, they may be stored at lower precision (e.g. ``np.float32``) to
+        save space.
     initial_conditions : :class:`~InitialConditions`, optional
         If given, the user and cosmo params will be set from this object, and it will not be
         re-calculated.
     perturbed_fields : list of :class:`~PerturbedField`, optional
         If given, must be compatible with initial_conditions. It will merely negate the necessity of
         re-calculating the
-        perturb fields. It will also be used to set the redshift if given.
+        perturb fields. It will also be used to set the redshift if given. May also
+        be a :class:`_LazyPerturbedFields`, in which case ``node_redshifts`` must be
+        given.
+    node_redshifts : list of float, optional
+        The redshifts of the perturbed fields. By default, these are read from
+        ``perturbed_fields``.
     cleanup : bool, optional
         A flag to specify whether the C routine cleans up its memory before returning.
         Typically, if `spin_temperature` is called directly, you will want this to be
@@ -431,6 +640,9 @@ def _run_lightcone_from_perturbed_fields(
         The filename to which to save the lightcone. The lightcone is returned in
         memory, and can be saved manually later, but including this filename will
         save the lightcone on each iteration, which can be helpful for checkpointing.
+        If ``user_params.MINIMIZE_MEMORY`` is set, the lightcone arrays are also
+        memory-mapped onto temporary files in the same directory while they are
+        filled, rather than held in RAM.
     return_at_z
         If given, evaluation of the lightcone will be stopped at the given redshift,
         and the partial lightcone object will be returned. Lightcone evaluation can
@@ -458,35 +670,40 @@ def _run_lightcone_from_perturbed_fields(
     lightconer.validate_options(inputs.user_params, inputs.flag_options)
 
     # Get the redshift through which we scroll and evaluate the ionization field.
-    scrollz = np.array([pf.redshift for pf in perturbed_fields])
-    if np.any(np.diff(scrollz) >= 0):
+    if node_redshifts is None:
+        node_redshifts = [pf.redshift for pf in perturbed_fields]
+    scrollz = np.array(node_redshifts, dtype=np.float64)
+    dz = np.diff(scrollz)
+    if np.any(dz >= 0):
         raise ValueError(
             "The perturb fields must be ordered by redshift in descending order.\n"
             + f"redshifts: {scrollz}\n"
-            + f"diffs: {np.diff(scrollz)}"
+            + f"diffs: {dz}"
         )
 
-    lcz = lightconer.lc_redshifts
-    if not np.all(scrollz.min() * 0.99 < lcz) and np.all(lcz < scrollz.max() * 1.01):
+    # scrollz is sorted (checked above), so its range is given by its ends.
+    zmin, zmax = scrollz[-1], scrollz[0]
+    lcz_min, lcz_max = lightconer.lc_redshift_range
+    if not (zmin * 0.99 < lcz_min and lcz_max < zmax * 1.01):
         # We have a 1% tolerance on the redshifts, because the lightcone redshifts are
         # computed via inverse fitting the comoving_distance.
         raise ValueError(
             "The lightcone redshifts are not compatible with the given redshift."
-            f"The range of computed redshifts is {scrollz.min()} to {scrollz.max()}, "
-            f"while the lightcone redshift range is {lcz.min()} to {lcz.max()}."
+            f"The range of computed redshifts is {zmin} to {zmax}, "
+            f"while the lightcone redshift range is {lcz_min} to {lcz_max}."
         )
 
     if (
         inputs.flag_options.PHOTON_CONS_TYPE == "z-photoncons"
-        and np.amin(scrollz) < global_params.PhotonConsEndCalibz
+        and zmin < global_params.PhotonConsEndCalibz
     ):
         raise ValueError(
             f"""
-            You have passed a redshift (z = {np.amin(scrollz)}) that is lower than the
+            You have passed a redshift (z = {zmin}) that is lower than the
             endpoint of the photon non-conservation correction
             (global_params.PhotonConsEndCalibz = {global_params.PhotonConsEndCalibz}).
             If this behaviour is desired then set global_params.PhotonConsEndCalibz to a
-            value lower than z = {np.amin(scrollz)}.
+            value lower than z = {zmin}.
             """
         )
 
@@ -499,6 +716,7 @@ def _run_lightcone_from_perturbed_fields(
         scrollz=scrollz,
         global_quantities=global_quantities,
         lightcone_filename=lightcone_filename,
+        global_quantities_dtype=global_quantities_dtype,
     )
     if start_idx >= len(scrollz):
         logger.info(
@@ -507,11 +725,19 @@ def _run_lightcone_from_perturbed_fields(
         # effectively adds one more iteration, but since start_idx > len(scrollz) it will be the only one
         yield None, None, None, lightcone
 
-    # Remove anything in initial_conditions not required for spin_temp
-    with contextlib.suppress(OSError):
-        initial_conditions.prepare_for_spin_temp(
-            flag_options=inputs.flag_options, force=always_purge
-        )
+    # Remove anything in initial_conditions not required for spin_temp. If the
+    # perturbed fields are yet to be computed, the boxes required for perturb must be
+    # kept as well, until the last of them is done (see _LazyPerturbedFields).
+    if isinstance(perturbed_fields, _LazyPerturbedFields):
+        prepare_initial_conditions = initial_conditions.prepare_for_perturb
+    else:
+        prepare_initial_conditions = initial_conditions.prepare_for_spin_temp
+
+    if always_purge or initial_conditions.is_cached:
+        with contextlib.suppress(OSError):
+            prepare_initial_conditions(
+                flag_options=inputs.flag_options, force=always_purge
+            )
     kw = {
         **{
             "initial_conditions": initial_conditions,
@@ -577,13 +803,16 @@ def _run_lightcone_from_perturbed_fields(
         # reverse the halo lists to be in line with the redshift lists
         pt_halos = pt_halos[::-1]
 
-    # Now that we've got all the perturb fields, we can purge init more.
-    with contextlib.suppress(OSError):
-        initial_conditions.prepare_for_spin_temp(
-            flag_options=inputs.flag_options, force=always_purge
-        )
+    # Now that we've got all the halo fields, we can purge init more.
+    if always_purge or initial_conditions.is_cached:
+        with contextlib.suppress(OSError):
+            prepare_initial_conditions(
+                flag_options=inputs.flag_options, force=always_purge
+            )
 
-    # arrays to hold cache filenames
+    # arrays to hold cache filenames (as plain strings, like for Coevals, so we don't
+    # construct Path objects for every box in every iteration).
+    direc_str = os.fspath(direc)
     perturb_files = []
     spin_temp_files = []
     ionize_files = []
@@ -602,169 +831,315 @@ def _run_lightcone_from_perturbed_fields(
     coeval = None
     prev_coeval = None
 
-    if lightcone_filename and not Path(lightcone_filename).exists():
-        lightcone.save(lightcone_filename)
-
-    # Iterate through redshift from top to bottom
-    for iz, z in enumerate(scrollz):
-        if iz < start_idx:
-            continue
-        logger.info(f"Computing Redshift {z} ({iz + 1}/{len(scrollz)}) iterations.")
-
-        # Best to get a perturb for this redshift, to pass to brightness_temperature
-        pf2 = perturbed_fields[iz]
-        # This ensures that all the arrays that are required for spin_temp are there,
-        # in case we dumped them from memory into file.
-        pf2.load_all()
-        if inputs.flag_options.USE_HALO_FIELD:
-            if not inputs.flag_options.FIXED_HALO_GRIDS:
-                ph2 = pt_halos[iz]
-                ph2.load_all()
-
-            hbox2 = sf.compute_halo_grid(
-                perturbed_halo_list=ph2,
-                previous_ionize_box=ib,
-                previous_spin_temp=st,
-                perturbed_field=pf2,
-                **kw,
-            )
+    # Append some info to the lightcone before we return. The lists and arrays are
+    # filled in-place as we go, so they only need to be attached once (and only if
+    # there is anything left to evaluate).
+    if start_idx < len(scrollz):
+        lightcone.cache_files = {
+            "init": [(0, os.path.join(direc_str, initial_conditions.filename))],
+            "perturb_field": perturb_files,
+            "ionized_box": ionize_files,
+            "brightness_temp": brightness_files,
+            "spin_temp": spin_temp_files,
+            "halobox": hbox_files,
+            "pt_halos": phf_files,
+        }
+
+        lightcone.log10_mturnovers = log10_mturnovers
+        lightcone.log10_mturnovers_mini = log10_mturnovers_mini
+
+    # Checkpoints are written in a background thread, so that writing the slices of
+    # one redshift overlaps with purging the boxes of the previous one. Each
+    # checkpoint is complete before its redshift is yielded, so that the lightcone's
+    # progress (and its file) are up to date for the caller.
+    checkpoint_pool = ThreadPoolExecutor(max_workers=1) if lightcone_filename else None
+    checkpoint = None
+    # The checkpoint file and thread must be released however we stop (including if
+    # the caller stops iterating early), so that the run can be resumed.
+    try:
+        if lightcone_filename:
+            if not Path(lightcone_filename).exists():
+                lightcone._preallocate_hdf5(lightcone_filename)
+            lightcone.open_checkpoint(lightcone_filename)
+
+        # Iterate through redshift from top to bottom
+        for iz, z in enumerate(scrollz):
+            if iz < start_idx:
+                continue
+            logger.info(f"Computing Redshift {z} ({iz + 1}/{len(scrollz)}) iterations.")
+
+            # Best to get a perturb for this redshift, to pass to brightness_temperature
+            pf2 = perturbed_fields[iz]
+
+            # This ensures that all the arrays that are required for spin_temp are there,
+            # in case we dumped them from memory into file.
+            pf2.load_all()
+            if inputs.flag_options.USE_HALO_FIELD:
+                if not inputs.flag_options.FIXED_HALO_GRIDS:
+                    ph2 = pt_halos[iz]
+                    ph2.load_all()
+
+                hbox2 = sf.compute_halo_grid(
+                    perturbed_halo_list=ph2,
+                    previous_ionize_box=ib,
+                    previous_spin_temp=st,
+                    perturbed_field=pf2,
+                    **kw,
+                )
+
+                if inputs.flag_options.USE_TS_FLUCT:
+                    hboxes.append(hbox2)
+                    xrs = sf.compute_xray_source_field(
+                        hboxes=hboxes,
+                        **kw,
+                    )
 
             if inputs.flag_options.USE_TS_FLUCT:
-                hboxes.append(hbox2)
-                xrs = sf.compute_xray_source_field(
-                    hboxes=hboxes,
+                st2 = sf.spin_temperature(
+                    previous_spin_temp=st,
+                    perturbed_field=pf2,
+                    xray_source_box=xrs,
+                    cleanup=(cleanup and iz == (len(scrollz) - 1)),
                     **kw,
                 )
 
-        if inputs.flag_options.USE_TS_FLUCT:
-            st2 = sf.spin_temperature(
-                previous_spin_temp=st,
+            ib2 = sf.compute_ionization_field(
+                previous_ionized_box=ib,
                 perturbed_field=pf2,
-                xray_source_box=xrs,
+                previous_perturbed_field=pf,
+                spin_temp=st2,
+                halobox=hbox2,
                 cleanup=(cleanup and iz == (len(scrollz) - 1)),
                 **kw,
             )
+            log10_mturnovers[iz] = ib2.log10_Mturnover_ave
+            log10_mturnovers_mini[iz] = ib2.log10_Mturnover_MINI_ave
 
-        ib2 = sf.compute_ionization_field(
-            previous_ionized_box=ib,
-            perturbed_field=pf2,
-            previous_perturbed_field=pf,
-            spin_temp=st2,
-            halobox=hbox2,
-            cleanup=(cleanup and iz == (len(scrollz) - 1)),
-            **kw,
-        )
-        log10_mturnovers[iz] = ib2.log10_Mturnover_ave
-        log10_mturnovers_mini[iz] = ib2.log10_Mturnover_MINI_ave
-
-        bt2 = sf.brightness_temperature(
-            inputs=inputs,
-            ionized_box=ib2,
-            perturbed_field=pf2,
-            spin_temp=st2,
-            **iokw,
-        )
-
-        coeval = Coeval(
-            redshift=z,
-            initial_conditions=initial_conditions,
-            perturbed_field=pf2,
-            ionized_box=ib2,
-            brightness_temp=bt2,
-            ts_box=st2,
-            halobox=hbox2,
-            photon_nonconservation_data=photon_nonconservation_data,
-            _globals=None,
-        )
+            bt2 = sf.brightness_temperature(
+                inputs=inputs,
+                ionized_box=ib2,
+                perturbed_field=pf2,
+                spin_temp=st2,
+                **iokw,
+            )
 
-        perturb_files.append((z, direc / pf2.filename))
-        if inputs.flag_options.USE_HALO_FIELD:
-            hbox_files.append((z, direc / hbox2.filename))
-            if not inputs.flag_options.FIXED_HALO_GRIDS:
-                phf_files.append((z, direc / ph2.filename))
-        if inputs.flag_options.USE_TS_FLUCT:
-            spin_temp_files.append((z, direc / st2.filename))
-        ionize_files.append((z, direc / ib2.filename))
-        brightness_files.append((z, direc / bt2.filename))
-
-        # Save mean/global quantities
-        for quantity in global_quantities:
-            lightcone.global_quantities[quantity][iz] = np.mean(
-                getattr(coeval, quantity)
+            coeval = Coeval(
+                redshift=z,
+                initial_conditions=initial_conditions,
+                perturbed_field=pf2,
+                ionized_box=ib2,
+                brightness_temp=bt2,
+                ts_box=st2,
+                halobox=hbox2,
+                photon_nonconservation_data=photon_nonconservation_data,
+                _globals=None,
             )
 
-        # Get lightcone slices
-        lc_index = None
-        if prev_coeval is not None:
-            for quantity, idx, this_lc in lightconer.make_lightcone_slices(
-                coeval, prev_coeval
-            ):
-                if this_lc is not None:
-                    lightcone.lightcones[quantity][..., idx] = this_lc
-                    lc_index = idx
-
-            # only checkpoint if we have slices
-            if lightcone_filename and lc_index is not None:
-                lightcone.make_checkpoint(
-                    lightcone_filename, redshift=z, index=lc_index
+            perturb_files.append((z, os.path.join(direc_str, pf2.filename)))
+            if inputs.flag_options.USE_HALO_FIELD:
+                hbox_files.append((z, os.path.join(direc_str, hbox2.filename)))
+                if not inputs.flag_options.FIXED_HALO_GRIDS:
+                    phf_files.append((z, os.path.join(direc_str, ph2.filename)))
+            if inputs.flag_options.USE_TS_FLUCT:
+                spin_temp_files.append((z, os.path.join(direc_str, st2.filename)))
+            ionize_files.append((z, os.path.join(direc_str, ib2.filename)))
+            brightness_files.append((z, os.path.join(direc_str, bt2.filename)))
+
+            # Save mean/global quantities
+            for quantity in global_quantities:
+                # Accumulate in double precision, even though the boxes are single.
+                lightcone.global_quantities[quantity][iz] = np.mean(
+                    getattr(coeval, quantity), dtype=np.float64
                 )
 
-        # purge arrays we don't need
-        if pf is not None:
-            with contextlib.suppress(OSError):
-                pf.purge(force=always_purge)
-        if ph2 is not None:
-            with contextlib.suppress(OSError):
-                ph2.purge(force=always_purge)
-        # we only need the SFR fields at previous redshifts for XraySourceBox
-        if hbox is not None:
+            # Get lightcone slices
+            lc_index = None
+            if prev_coeval is not None:
+                for quantity, idx, this_lc in lightconer.make_lightcone_slices(
+                    coeval, prev_coeval
+                ):
+                    if this_lc is not None:
+                        lightcone.lightcones[quantity][..., idx] = this_lc
+                        lc_index = idx
+
+                # only checkpoint if we have slices
+                if lightcone_filename and lc_index is not None:
+                    checkpoint = checkpoint_pool.submit(
+                        lightcone.make_checkpoint,
+                        lightcone_filename,
+                        redshift=z,
+                        index=lc_index,
+                    )
+
+            # purge arrays we don't need
+            if pf is not None:
+                with contextlib.suppress(OSError):
+                    pf.purge(force=always_purge)
+            if ph2 is not None:
+                with contextlib.suppress(OSError):
+                    ph2.purge(force=always_purge)
+            # we only need the SFR fields at previous redshifts for XraySourceBox
+            if hbox is not None:
+                with contextlib.suppress(OSError):
+                    hbox.prepare(
+                        keep=[
+                            "halo_sfr",
+                            "halo_sfr_mini",
+                            "halo_xray",
+                            "log10_Mcrit_MCG_ave",
+                        ],
+                        force=always_purge,
+                    )
+
+            # Save current ones as old ones.
+            pf = pf2
+            hbox = hbox2
+            st = st2
+            ib = ib2
+            prev_coeval = coeval
+
+            if checkpoint is not None:
+                checkpoint.result()
+                checkpoint = None
+
+            # last redshift things
+            if iz == len(scrollz) - 1:
+                lightcone.close_checkpoint()
+
+                if inputs.flag_options.PHOTON_CONS_TYPE == "z-photoncons":
+                    photon_nonconservation_data = _get_photon_nonconservation_data()
+
+                if lib.photon_cons_allocated:
+                    lib.FreePhotonConsMemory()
+
+                lightcone.photon_nonconservation_data = photon_nonconservation_data
+                if (
+                    isinstance(lightcone, AngularLightcone)
+                    and lightconer.get_los_velocity
+                ):
+                    lightcone.compute_rsds(
+                        fname=lightcone_filename,
+                        n_subcells=inputs.astro_params.N_RSD_STEPS,
+                    )
+
+            yield iz, z, coeval, lightcone
+    finally:
+        try:
+            # Make sure the last checkpoint is complete (and raise its errors).
+            if checkpoint is not None:
+                checkpoint.result()
+        finally:
+            if checkpoint_pool is not None:
+                checkpoint_pool.shutdown()
+            lightcone.close_checkpoint()
+
+
+# The initial conditions used by perturb-field worker processes (see
+# _compute_perturbed_fields), set once per process by _init_perturb_worker.
+_worker_initial_conditions = None
+
+
+def _init_perturb_worker(initial_conditions, global_kwargs):
+    global _worker_initial_conditions
+    _worker_initial_conditions = initial_conditions
+    for k, v in global_kwargs.items():
+        if isinstance(v, str):
+            v = ffi.new("char[]", v.encode())
+        setattr(global_params, k, v)
+
+
+def _perturb_field_worker(redshift, inputs, iokw):
+    return sf.perturb_field(
+        redshift=redshift,
+        inputs=inputs,
+        initial_conditions=_worker_initial_conditions,
+        **iokw,
+    )
+
+
+class _LazyPerturbedFields(Sequence):
+    """The perturbed fields at a list of redshifts, computed only when accessed.
+
+    This is used when minimizing memory, so that the fields are never all held at
+    once. Fields are not stored, so each should only be accessed once. The boxes of
+    the initial conditions required for perturb are dropped once the last field has
+    been computed.
+    """
+
+    def __init__(self, redshifts, inputs, initial_conditions, iokw, always_purge):
+        self.redshifts = redshifts
+        self.inputs = inputs
+        self.initial_conditions = initial_conditions
+        self.iokw = iokw
+        self.always_purge = always_purge
+
+    def __getitem__(self, index):
+        index = range(len(self))[index]
+        p = sf.perturb_field(
+            redshift=self.redshifts[index],
+            inputs=self.inputs,
+            initial_conditions=self.initial_conditions,
+            **self.iokw,
+        )
+
+        # Not purged here: the lightcone loop purges each field once it is done with it.
+        ics = self.initial_conditions
+        if index == len(self) - 1 and (self.always_purge or ics.is_cached):
             with contextlib.suppress(OSError):
-                hbox.prepare(
-                    keep=[
-                        "halo_sfr",
-                        "halo_sfr_mini",
-                        "halo_xray",
-                        "log10_Mcrit_MCG_ave",
-                    ],
-                    force=always_purge,
+                ics.prepare_for_spin_temp(
+                    flag_options=self.inputs.flag_options, force=self.always_purge
                 )
+        return p
 
-        # Save current ones as old ones.
-        pf = pf2
-        hbox = hbox2
-        st = st2
-        ib = ib2
-        prev_coeval = coeval
-
-        # last redshift things
-        if iz == len(scrollz) - 1:
-            if inputs.flag_options.PHOTON_CONS_TYPE == "z-photoncons":
-                photon_nonconservation_data = _get_photon_nonconservation_data()
-
-            if lib.photon_cons_allocated:
-                lib.FreePhotonConsMemory()
-
-            lightcone.photon_nonconservation_data = photon_nonconservation_data
-            if isinstance(lightcone, AngularLightcone) and lightconer.get_los_velocity:
-                lightcone.compute_rsds(
-                    fname=lightcone_filename, n_subcells=inputs.astro_params.N_RSD_STEPS
-                )
+    def __len__(self):
+        return len(self.redshifts)
 
-        # Append some info to the lightcone before we return
-        lightcone.cache_files = {
-            "init": [(0, direc / initial_conditions.filename)],
-            "perturb_field": perturb_files,
-            "ionized_box": ionize_files,
-            "brightness_temp": brightness_files,
-            "spin_temp": spin_temp_files,
-            "halobox": hbox_files,
-            "pt_halos": phf_files,
-        }
 
-        lightcone.log10_mturnovers = log10_mturnovers
-        lightcone.log10_mturnovers_mini = log10_mturnovers_mini
+def _compute_perturbed_fields(
+    redshifts, inputs, initial_conditions, iokw, n_processes, always_purge
+):
+    """Compute the perturbed fields at each of the given redshifts.
+
+    The fields are independent of each other, so with ``n_processes > 1`` they are
+    computed in parallel in separate processes, each holding a copy of the initial
+    conditions. Otherwise they are computed in turn. When minimizing memory, a
+    :class:`_LazyPerturbedFields` is returned instead, which computes each field only
+    when it is needed, so that they are never all held at once.
+    """
+    if inputs.user_params.MINIMIZE_MEMORY:
+        return _LazyPerturbedFields(
+            redshifts, inputs, initial_conditions, iokw, always_purge
+        )
 
-        yield iz, z, coeval, lightcone
+    if n_processes <= 1:
+        return [
+            sf.perturb_field(
+                redshift=z, inputs=inputs, initial_conditions=initial_conditions, **iokw
+            )
+            for z in redshifts
+        ]
+
+    # Workers are spawned rather than forked, since forking a process that has
+    # already used OpenMP is unsafe. They therefore don't inherit the global
+    # parameters, so we pass them all on (the paths, which are C strings, as str).
+    global_kwargs = {
+        k: ffi.string(v).decode() if isinstance(v, ffi.CData) else v
+        for k, v in global_params.items()
+    }
+    with ProcessPoolExecutor(
+        max_workers=min(n_processes, len(redshifts)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_perturb_worker,
+        initargs=(initial_conditions, global_kwargs),
+    ) as pool:
+        return list(
+            pool.map(
+                _perturb_field_worker,
+                redshifts,
+                repeat(inputs),
+                repeat(iokw),
+            )
+        )
 
 
 def run_lightcone(
@@ -772,6 +1147,7 @@ def run_lightcone(
     lightconer: Lightconer,
     inputs: InputParameters,
     global_quantities=("brightness_temp", "xH_box"),
+    global_quantities_dtype=np.float64,
     initial_conditions: InitialConditions | None = None,
     perturbed_fields: Sequence[PerturbedField | None] = (None,),
     cleanup=True,
@@ -781,6 +1157,7 @@ def run_lightcone(
     regenerate=None,
     always_purge: bool = False,
     lightcone_filename: str | Path = None,
+    n_processes: int = 1,
     **global_kwargs,
 ):
     r"""
@@ -800,6 +1177,11 @@ def run_lightcone(
         These may be any of the quantities that can be used in ``Lightconer.quantities``.
         The mean is taken over the full 3D cube at each redshift, rather than a 2D
         slice.
+    global_quantities_dtype : numpy dtype, optional
+        The dtype in which to store the global quantities. The means are always
+        computed in double precision, but as they are typically only used for
+        diagnostics, they may be stored at lower precision (e.g. ``np.float32``) to
+        save space.
     initial_conditions : :class:`~InitialConditions`, optional
         If given, the user and cosmo params will be set from this object, and it will not be
         re-calculated.
@@ -817,6 +1199,14 @@ def run_lightcone(
         The filename to which to save the lightcone. The lightcone is returned in
         memory, and can be saved manually later, but including this filename will
         save the lightcone on each iteration, which can be helpful for checkpointing.
+        If ``user_params.MINIMIZE_MEMORY`` is set, the lightcone arrays are also
+        memory-mapped onto temporary files in the same directory while they are
+        filled, rather than held in RAM.
+    n_processes
+        The number of processes with which to compute the perturbed fields, if they
+        are not given. Each process holds a copy of the initial conditions and uses
+        ``user_params.N_THREADS`` threads, and any ``hooks`` must be picklable. The
+        fields are always computed serially if ``user_params.MINIMIZE_MEMORY`` is set.
     \*\*global_kwargs :
         Any attributes for :class:`~py21cmfast.inputs.GlobalParams`. This will
         *temporarily* set global attributes for the duration of the function. Note that
@@ -854,25 +1244,33 @@ def run_lightcone(
     # while we still use the full list for caching etc, we don't need to run below the lightconer instance
     #   So stop one after the lightconer
     scrollz = np.copy(inputs.node_redshifts)
-    below_lc_z = inputs.node_redshifts <= min(lightconer.lc_redshifts)
+    lcz_min, lcz_max = lightconer.lc_redshift_range
+    below_lc_z = inputs.node_redshifts <= lcz_min
     if np.any(below_lc_z):
         final_node = np.argmax(below_lc_z)
         scrollz = scrollz[: final_node + 1]  # inclusive
 
-    if pf_given and scrollz != [pf.redshift for pf in perturbed_fields]:
+    if pf_given and (
+        len(perturbed_fields) != len(scrollz)
+        or any(
+            not math.isclose(pf.redshift, z, abs_tol=1e-5)
+            for pf, z in zip(perturbed_fields, scrollz)
+        )
+    ):
         raise ValueError(
             f"given PerturbField redshifts {[pf.redshift for pf in perturbed_fields]}"
             + f"do not match selected InputParameters.node_redshifts {scrollz}"
         )
-    lcz = lightconer.lc_redshifts
 
-    if not np.all(min(scrollz) * 0.99 < lcz) and np.all(lcz < max(scrollz) * 1.01):
+    # node_redshifts are sorted in descending order.
+    zmin, zmax = scrollz[-1], scrollz[0]
+    if not (zmin * 0.99 < lcz_min and lcz_max < zmax * 1.01):
         # We have a 1% tolerance on the redshifts, because the lightcone redshifts are
         # computed via inverse fitting the comoving_distance.
         raise ValueError(
             "The lightcone redshifts are not compatible with the given redshift."
-            f"The range of computed redshifts is {min(scrollz)} to {max(scrollz)}, "
-            f"while the lightcone redshift range is {lcz.min()} to {lcz.max()}."
+            f"The range of computed redshifts is {zmin} to {zmax}, "
+            f"while the lightcone redshift range is {lcz_min} to {lcz_max}."
         )
 
     iokw = {"hooks": hooks, "regenerate": regenerate, "direc": direc}
@@ -885,33 +1283,33 @@ def run_lightcone(
 
     # We can go ahead and purge some of the stuff in the initial_conditions, but only if
     # it is cached -- otherwise we could be losing information.
-    try:
-        # TODO: should really check that the file at path actually contains a fully
-        # working copy of the initial_conditions.
-        initial_conditions.prepare_for_perturb(
-            flag_options=inputs.flag_options, force=always_purge
-        )
-    except OSError:
-        pass
+    # TODO: should really check that the file at path actually contains a fully
+    # working copy of the initial_conditions.
+    if always_purge or initial_conditions.is_cached:
+        with contextlib.suppress(OSError):
+            initial_conditions.prepare_for_perturb(
+                flag_options=inputs.flag_options, force=always_purge
+            )
 
     if not pf_given:
-        perturbed_fields = []
-        for z in scrollz:
-            p = sf.perturb_field(
-                redshift=z, inputs=inputs, initial_conditions=initial_conditions, **iokw
-            )
-            if inputs.user_params.MINIMIZE_MEMORY:
-                with contextlib.suppress(OSError):
-                    p.purge(force=always_purge)
-            perturbed_fields.append(p)
+        perturbed_fields = _compute_perturbed_fields(
+            scrollz,
+            inputs=inputs,
+            initial_conditions=initial_conditions,
+            iokw=iokw,
+            n_processes=n_processes,
+            always_purge=always_purge,
+        )
 
     yield from _run_lightcone_from_perturbed_fields(
         initial_conditions=initial_conditions,
         perturbed_fields=perturbed_fields,
+        node_redshifts=None if pf_given else scrollz,
         lightconer=lightconer,
         inputs=inputs,
         regenerate=regenerate,
         global_quantities=global_quantities,
+        global_quantities_dtype=global_quantities_dtype,
         direc=direc,
         cleanup=cleanup,
         hooks=hooks,
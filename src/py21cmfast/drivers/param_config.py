@@ -7,10 +7,11 @@ import logging
 import numpy as np
 import os
 import warnings
-from functools import cached_property
+from functools import cache, cached_property, wraps
 from typing import Any, Sequence
 
 from .._cfg import config
+from .._memo import FIFOCache
 from ..run_templates import create_params_from_template
 from ..wrapper.globals import global_params
 from ..wrapper.inputs import (
@@ -59,10 +60,64 @@ def get_logspaced_redshifts(
     return np.array(redshifts)[::-1]
 
 
+# Keys of the cross-validations of InputParameters that have passed (used as a
+# set), see _cached_validation.
+_VALIDATED = FIFOCache(maxsize=256)
+
+# The number of warnings raised by cross-validators, see _validation_warning.
+_n_validation_warnings = 0
+
+
+def _validation_warning(message: str):
+    """Warn about the inputs from a cross-validator.
+
+    Validations that warn are not remembered by :func:`_cached_validation`, so that
+    the warning is raised (subject to the warning filters) every time.
+    """
+    global _n_validation_warnings
+    _n_validation_warnings += 1
+    warnings.warn(message, stacklevel=2)
+
+
+def _cached_validation(validator):
+    """Skip a cross-struct validator for inputs that have already passed it.
+
+    The result depends only on the (immutable, hashable) input structs and a few
+    global settings, so they form the key. Validations that emit warnings (through
+    :func:`_validation_warning`) are not remembered.
+    """
+
+    @wraps(validator)
+    def wrapper(self, att, val):
+        key = (
+            validator.__name__,
+            val,
+            self.user_params,
+            self.flag_options,
+            global_params.HII_FILTER,
+            global_params.EVOLVE_DENSITY_LINEARLY,
+            config["ignore_R_BUBBLE_MAX_error"],
+        )
+        if key in _VALIDATED:
+            return
+
+        n_warnings = _n_validation_warnings
+        validator(self, att, val)
+
+        if _n_validation_warnings == n_warnings:
+            _VALIDATED[key] = None
+
+    return wrapper
+
+
 def _node_redshifts_converter(value, self):
     # we assume an array-like is passed
     if hasattr(value, "__len__"):
-        return np.sort(np.array(value, dtype=float).flatten())[::-1]
+        # Reversing the sorted array gives a (negatively-strided) view, so make it
+        # contiguous for the reductions and searches done on it downstream.
+        return np.ascontiguousarray(
+            np.sort(np.asarray(value, dtype=np.float64).ravel())[::-1]
+        )
     if isinstance(value, float):
         return np.array([value])
     return np.array([])
@@ -111,6 +166,7 @@ class InputParameters:
             )
 
     @flag_options.validator
+    @_cached_validation
     def _flag_options_validator(self, att, val):
         if self.user_params is not None:
             if (
@@ -118,7 +174,7 @@ class InputParameters:
                 and not self.user_params.USE_RELATIVE_VELOCITIES
                 and not val.FIX_VCB_AVG
             ):
-                warnings.warn(
+                _validation_warning(
                     "USE_MINI_HALOS needs USE_RELATIVE_VELOCITIES to get the right evolution!"
                 )
 
@@ -131,9 +187,12 @@ class InputParameters:
                 raise NotImplementedError(msg)
 
         if val.USE_EXP_FILTER and not val.USE_HALO_FIELD:
-            warnings.warn("USE_EXP_FILTER has no effect unless USE_HALO_FIELD is true")
+            _validation_warning(
+                "USE_EXP_FILTER has no effect unless USE_HALO_FIELD is true"
+            )
 
     @astro_params.validator
+    @_cached_validation
     def _astro_params_validator(self, att, val):
         if val.R_BUBBLE_MAX > self.user_params.BOX_LEN:
             raise InputCrossValidationError(
@@ -141,14 +200,14 @@ class InputParameters:
             )
 
         if val.R_BUBBLE_MAX != 50 and self.flag_options.INHOMO_RECO:
-            warnings.warn(
+            _validation_warning(
                 "You are setting R_BUBBLE_MAX != 50 when INHOMO_RECO=True. "
                 "This is non-standard (but allowed), and usually occurs upon manual "
                 "update of INHOMO_RECO"
             )
 
         if val.M_TURN > 8 and self.flag_options.USE_MINI_HALOS:
-            warnings.warn(
+            _validation_warning(
                 "You are setting M_TURN > 8 when USE_MINI_HALOS=True. "
                 "This is non-standard (but allowed), and usually occurs upon manual "
                 "update of M_TURN"
@@ -164,15 +223,16 @@ class InputParameters:
             )
 
             if config["ignore_R_BUBBLE_MAX_error"]:
-                warnings.warn(msg)
+                _validation_warning(msg)
             else:
                 raise ValueError(msg)
 
     @user_params.validator
+    @_cached_validation
     def _user_params_validator(self, att, val):
         # perform a very rudimentary check to see if we are underresolved and not using the linear approx
         if val.BOX_LEN > val.DIM and not global_params.EVOLVE_DENSITY_LINEARLY:
-            warnings.warn(
+            _validation_warning(
                 "Resolution is likely too low for accurate evolved density fields\n It Is recommended"
                 + "that you either increase the resolution (DIM/BOX_LEN) or"
                 + "set the EVOLVE_DENSITY_LINEARLY flag to 1"
@@ -210,21 +270,25 @@ class InputParameters:
         All required fields not present in the `OutputStruct` objects need to be provided.
         """
         # get matching fields in each output struct
-        fieldnames = [field.name for field in attrs.fields(self.__class__) if field.eq]
+        fieldnames = _compared_fieldnames(self.__class__)
         for struct in output_structs:
             if struct is None:
                 continue
 
-            input_params = {
-                k.lstrip(""): getattr(struct, k, None)
-                for k in struct._inputs
-                if k.lstrip("") in fieldnames
-            }
-
             # Since self is always complete we can just compare against it
-            for field, struct_val in input_params.items():
+            for field in struct._inputs:
+                if field not in fieldnames:
+                    continue
+
+                struct_val = getattr(struct, field, None)
+                if struct_val is None:
+                    continue
+
                 input_val = getattr(self, field)
-                if struct_val is not None and struct_val != input_val:
+                # The structs are usually shared (not copied) between the inputs and
+                # the outputs made from them, in which case they needn't be compared
+                # field-by-field.
+                if struct_val is not input_val and struct_val != input_val:
                     raise ValueError(
                         f"InputParameters not compatible with {struct} {field}: inputs {input_val} != struct {struct_val}"
                     )
@@ -238,9 +302,11 @@ class InputParameters:
         struct_args = {}
         for inp_type in ("cosmo_params", "user_params", "astro_params", "flag_options"):
             obj = getattr(self, inp_type)
-            struct_args[inp_type] = obj.clone(
-                **{k: v for k, v in kwargs.items() if hasattr(obj, k)}
-            )
+            updates = {k: v for k, v in kwargs.items() if hasattr(obj, k)}
+            # Structs are immutable, so unchanged ones can be shared by the clone
+            # rather than rebuilt (and re-validated).
+            if updates:
+                struct_args[inp_type] = obj.clone(**updates)
 
         return self.clone(**struct_args)
 
@@ -285,6 +351,12 @@ def check_redshift_consistency(redshift, output_structs):
             )
 
 
+@cache
+def _compared_fieldnames(cls) -> frozenset[str]:
+    """Get the names of the fields of an attrs class that are used for equality."""
+    return frozenset(field.name for field in attrs.fields(cls) if field.eq)
+
+
 def _get_config_options(
     direc, regenerate, write, hooks
 ) -> tuple[str, bool, dict[callable, dict[str, Any]]]:
@@ -9,12 +9,12 @@ import contextlib
 import logging
 import numpy as np
 import warnings
-from astropy import units as un
-from astropy.cosmology import z_at_value
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Sequence
 
+from .._memo import FIFOCache
 from ..wrapper.cfuncs import construct_fftw_wisdoms, get_halo_list_buffer_size
 from ..wrapper.inputs import (
     AstroParams,
@@ -42,6 +42,9 @@ from .param_config import (
 
 logger = logging.getLogger(__name__)
 
+# Dummy boxes shared between calls, see _dummy_box.
+_DUMMY_BOXES = FIFOCache(maxsize=16)
+
 
 def set_globals(func: callable):
     """Decorator that sets global parameters."""
@@ -49,7 +52,8 @@ def set_globals(func: callable):
     @wraps(func)
     def inner(*args, **kwargs):
         # Get all kwargs that are actually global params
-        global_kwargs = {k: v for k, v in kwargs.items() if k in global_params.keys()}
+        global_keys = set(global_params.keys())
+        global_kwargs = {k: v for k, v in kwargs.items() if k in global_keys}
         other_kwargs = {k: v for k, v in kwargs.items() if k not in global_kwargs}
         with global_params.use(**global_kwargs):
             return func(*args, **other_kwargs)
@@ -57,6 +61,48 @@ def set_globals(func: callable):
     return inner
 
 
+def _dummy_box(cls, inputs: InputParameters):
+    """Get a dummy box of type ``cls``, to pass to C in place of an unused input.
+
+    Dummy boxes are never computed, so one is shared between all calls with the same
+    parameters rather than allocating a new one each time.
+    """
+    key = (
+        cls,
+        inputs.user_params,
+        inputs.cosmo_params,
+        inputs.astro_params,
+        inputs.flag_options,
+        inputs.random_seed,
+    )
+    try:
+        return _DUMMY_BOXES[key]
+    except KeyError:
+        pass
+
+    box = cls(redshift=0.0, inputs=inputs, dummy=True)
+
+    _DUMMY_BOXES[key] = box
+    return box
+
+
+def _read_cached(box, direc) -> bool:
+    """Read the boxes of ``box`` from the cache in ``direc``, if they exist there.
+
+    Returns whether they were read in. The (cheap) search for the file is done
+    up-front, so that a cache miss does not need to raise and catch an exception.
+    """
+    pth = box.find_existing(direc)
+    if pth is None:
+        return False
+
+    # The file may still be unreadable, e.g. if it does not have the right structure.
+    with contextlib.suppress(OSError):
+        box.read(fname=pth)
+        return True
+    return False
+
+
 @set_globals
 def compute_initial_conditions(
     *,
@@ -119,8 +165,7 @@ def compute_initial_conditions(
 
     # First check whether the boxes already exist.
     if not regenerate:
-        with contextlib.suppress(OSError):
-            ics.read(direc)
+        if _read_cached(ics, direc):
             logger.info(
                 f"Existing initial_conditions found and read in (seed={ics.random_seed})."
             )
@@ -183,8 +228,7 @@ def perturb_field(
 
     # Check whether the boxes already exist
     if not regenerate:
-        with contextlib.suppress(OSError):
-            fields.read(direc)
+        if _read_cached(fields, direc):
             logger.info(
                 f"Existing z={redshift} perturb_field boxes found and read in "
                 f"(seed={fields.random_seed})."
@@ -267,11 +311,7 @@ def determine_halo_list(
     )
 
     if descendant_halos is None:
-        descendant_halos = HaloField(
-            redshift=0.0,
-            inputs=inputs,
-            dummy=True,
-        )
+        descendant_halos = _dummy_box(HaloField, inputs)
 
     # Initialize halo list boxes.
     fields = HaloField(
@@ -280,20 +320,20 @@ def determine_halo_list(
         buffer_size=hbuffer_size,
         inputs=inputs,
     )
-    # Construct FFTW wisdoms. Only if required
-    construct_fftw_wisdoms(
-        user_params=inputs.user_params, cosmo_params=inputs.cosmo_params
-    )
 
     if not regenerate:
-        with contextlib.suppress(OSError):
-            fields.read(direc)
+        if _read_cached(fields, direc):
             logger.info(
                 f"Existing z={redshift} determine_halo_list boxes found and read in "
                 f"(seed={fields.random_seed})."
             )
             return fields
 
+    # Construct FFTW wisdoms. Only if required
+    construct_fftw_wisdoms(
+        user_params=inputs.user_params, cosmo_params=inputs.cosmo_params
+    )
+
     # Run the C Code
     return fields.compute(
         ics=initial_conditions,
@@ -362,8 +402,7 @@ def perturb_halo_list(
 
     # Check whether the boxes already exist
     if not regenerate:
-        with contextlib.suppress(OSError):
-            fields.read(direc)
+        if _read_cached(fields, direc):
             logger.info(
                 f"Existing z={redshift} perturb_halo_list boxes found and read in "
                 f"(seed={fields.random_seed})."
@@ -455,8 +494,7 @@ def compute_halo_grid(
 
     # Check whether the boxes already exist
     if not regenerate:
-        with contextlib.suppress(OSError):
-            box.read(direc)
+        if _read_cached(box, direc):
             logger.info(
                 f"Existing z={redshift} halo_box boxes found and read in "
                 f"(seed={box.random_seed})."
@@ -469,22 +507,14 @@ def compute_halo_grid(
                 "You must provide the perturbed field if FIXED_HALO_GRIDS is True or AVG_BELOW_SAMPLER is True"
             )
         else:
-            perturbed_field = PerturbedField(
-                redshift=0.0,
-                inputs=inputs,
-                dummy=True,
-            )
+            perturbed_field = _dummy_box(PerturbedField, inputs)
     elif perturbed_halo_list is None:
         if not inputs.flag_options.FIXED_HALO_GRIDS:
             raise ValueError(
                 "You must provide the perturbed halo list if FIXED_HALO_GRIDS is False"
             )
         else:
-            perturbed_halo_list = PerturbHaloField(
-                redshift=0.0,
-                inputs=inputs,
-                dummy=True,
-            )
+            perturbed_halo_list = _dummy_box(PerturbHaloField, inputs)
 
     # NOTE: due to the order, we use the previous spin temp here, like spin_temperature,
     #       but UNLIKE ionize_box, which uses the current box
@@ -496,11 +526,7 @@ def compute_halo_grid(
             or not inputs.flag_options.USE_MINI_HALOS
         ):
             # Dummy spin temp is OK since we're above Z_HEAT_MAX
-            previous_spin_temp = TsBox(
-                redshift=0.0,
-                inputs=inputs,
-                dummy=True,
-            )
+            previous_spin_temp = _dummy_box(TsBox, inputs)
         else:
             raise ValueError("Below Z_HEAT_MAX you must specify the previous_spin_temp")
 
@@ -510,7 +536,7 @@ def compute_halo_grid(
             or not inputs.flag_options.USE_MINI_HALOS
         ):
             # Dummy ionize box is OK since we're above Z_HEAT_MAX
-            previous_ionize_box = IonizedBox(redshift=0.0, inputs=inputs, dummy=True)
+            previous_ionize_box = _dummy_box(IonizedBox, inputs)
         else:
             raise ValueError(
                 "Below Z_HEAT_MAX you must specify the previous_ionize_box"
@@ -532,6 +558,7 @@ def interp_halo_boxes(
     halo_boxes: list[HaloBox],
     fields: list[str],
     redshift: float,
+    out: HaloBox | None = None,
 ) -> HaloBox:
     """
     Interpolate HaloBox history to the desired redshift.
@@ -549,72 +576,144 @@ def interp_halo_boxes(
         The properties of the haloboxes to be interpolated
     redshift : float
         The desired redshift of interpolation
+    out : :class:`~HaloBox`, optional
+        A box returned by a previous call to this function, whose memory is re-used
+        (and overwritten) for the result, rather than allocating a new box.
 
     Returns
     -------
     :class:`~HaloBox` :
         An object containing the halo box data
     """
-    z_halos = [box.redshift for box in halo_boxes]
+    inputs.check_output_compatibility(halo_boxes)
+    (idx_desc,), (interp_param,) = _halo_box_brackets(halo_boxes, [redshift])
+    with _interp_pool(inputs, len(fields)) as pool:
+        return _interp_halo_box_pair(
+            inputs,
+            halo_boxes[idx_desc],
+            halo_boxes[idx_desc + 1],
+            fields,
+            redshift,
+            interp_param,
+            out=out,
+            pool=pool,
+        )
+
+
+def _interp_pool(inputs: InputParameters, n_fields: int):
+    """Get a thread pool to interpolate ``n_fields`` halo box fields concurrently.
+
+    The fields are independent, and numpy releases the GIL for the interpolation, so
+    they are interpolated concurrently when we have the threads for it. Otherwise, a
+    context giving no pool (i.e. ``None``) is returned.
+    """
+    n_workers = min(inputs.user_params.N_THREADS, n_fields)
+    if n_workers > 1:
+        return ThreadPoolExecutor(max_workers=n_workers)
+    return contextlib.nullcontext()
+
+
+def _halo_box_brackets(
+    halo_boxes: list[HaloBox], redshifts: Sequence[float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the pair of (ascending) halo boxes that brackets each of ``redshifts``.
+
+    Returns the index of the lower-redshift box of each pair, and the interpolation
+    parameter between the pair at each redshift.
+    """
+    z_halos = np.array([box.redshift for box in halo_boxes])
     if not np.all(np.diff(z_halos) > 0):
         raise ValueError("halo_boxes must be in ascending order of redshift")
 
-    if redshift > z_halos[-1] or redshift < z_halos[0]:
-        raise ValueError(f"Invalid z_target {redshift} for redshift array {z_halos}")
+    redshifts = np.asarray(redshifts, dtype=float)
+    if np.any(redshifts > z_halos[-1]) or np.any(redshifts < z_halos[0]):
+        raise ValueError(f"Invalid z_target {redshifts} for redshift array {z_halos}")
 
-    idx_prog = np.searchsorted(z_halos, redshift, side="left")
+    idx_prog = np.searchsorted(z_halos, redshifts, side="left")
 
-    if idx_prog == 0 or idx_prog == len(z_halos):
-        logger.debug(f"redshift {redshift} beyond limits, {z_halos[0], z_halos[-1]}")
+    if np.any(idx_prog == 0) or np.any(idx_prog == len(z_halos)):
+        logger.debug(f"redshift {redshifts} beyond limits, {z_halos[0], z_halos[-1]}")
         raise ValueError
 
-    z_prog = z_halos[idx_prog]
     idx_desc = idx_prog - 1
-
     z_desc = z_halos[idx_desc]
-    interp_param = (redshift - z_desc) / (z_prog - z_desc)
+    interp_param = (redshifts - z_desc) / (z_halos[idx_prog] - z_desc)
+    return idx_desc, interp_param
 
+
+def _interp_halo_box_pair(
+    inputs: InputParameters,
+    hbox_desc: HaloBox,
+    hbox_prog: HaloBox,
+    fields: list[str],
+    redshift: float,
+    interp_param: float,
+    out: HaloBox | None = None,
+    pool: ThreadPoolExecutor | None = None,
+) -> HaloBox:
+    """Interpolate the given fields between two halo boxes (see interp_halo_boxes).
+
+    If a ``pool`` is given (see :func:`_interp_pool`), the fields are interpolated in
+    its threads.
+    """
     # I set the box redshift to be the stored one so it is read properly into the ionize box
     # for the xray source it doesn't matter, also since it is not _compute()'d, it won't be cached
-    inputs.check_output_compatibility(halo_boxes)
-    hbox_out = HaloBox(
-        redshift=redshift,
-        inputs=inputs,
-    )
+    if out is None:
+        hbox_out = HaloBox(
+            redshift=redshift,
+            inputs=inputs,
+        )
 
-    # initialise the memory
-    hbox_out()
+        # initialise the memory
+        hbox_out()
+    else:
+        hbox_out = out
+        hbox_out.redshift = redshift
+
+    def _interp_array(arrays):
+        # desc + t * (prog - desc), computed in the output array without allocating
+        # any temporary boxes. The array is already bound to the C struct, so the
+        # result is visible to the backend as-is.
+        desc, prog, interp_field = arrays
+        np.subtract(prog, desc, out=interp_field)
+        interp_field *= interp_param
+        interp_field += desc
+
+    array_fields = [field for field in fields if field in hbox_out._array_state]
+    # Look up the arrays once, up-front (which also reads in any that are only on
+    # disk, before handing them to the workers).
+    array_triples = [
+        (getattr(hbox_desc, field), getattr(hbox_prog, field), getattr(hbox_out, field))
+        for field in array_fields
+    ]
 
-    # interpolate halo boxes in gridded SFR
-    hbox_prog = halo_boxes[idx_prog]
-    hbox_desc = halo_boxes[idx_desc]
+    if pool is not None and len(array_triples) > 1:
+        list(pool.map(_interp_array, array_triples))
+    else:
+        for arrays in array_triples:
+            _interp_array(arrays)
 
     for field in fields:
-        interp_field = (1 - interp_param) * getattr(
-            hbox_desc, field
-        ) + interp_param * getattr(hbox_prog, field)
-        if field in hbox_out._array_state.keys():
-            getattr(hbox_out, field)[...] = interp_field
+        if field in array_fields:
+            # Since we don't compute, we have to mark the array as computed
+            hbox_out._array_state[field].computed_in_mem = True
         else:
+            interp_field = (1 - interp_param) * getattr(
+                hbox_desc, field
+            ) + interp_param * getattr(hbox_prog, field)
             setattr(hbox_out, field, interp_field)
+            setattr(hbox_out.cstruct, field, interp_field)
 
     logger.debug(
-        f"interpolated to z={redshift} between [{z_desc},{z_prog}] ({interp_param})"
-    )
-    logger.debug(
-        f"{fields[0]} averages desc ({idx_desc}): {getattr(hbox_desc, fields[0]).mean()}"
-        + f" interp {getattr(hbox_out, fields[0]).mean()}"
-        + f" prog ({idx_prog}) {getattr(hbox_prog, fields[0]).mean()}"
+        f"interpolated to z={redshift} between [{hbox_desc.redshift},{hbox_prog.redshift}] ({interp_param})"
     )
-
-    # HACK: this passes the field pointers to the backend,
-    # NOTE: the arrays are initialised in the call above so they shouldn't
-    # be re-initialised causing a memory leak
-    hbox_out._init_cstruct()
-    # HACK: Since we don't compute, we have to mark the struct as computed
-    for k, state in hbox_out._array_state.items():
-        if state.initialized and k in fields:
-            state.computed_in_mem = True
+    if logger.isEnabledFor(logging.DEBUG):
+        # Only take the means (which are full passes over the boxes) if they're logged.
+        logger.debug(
+            f"{fields[0]} averages desc: {getattr(hbox_desc, fields[0]).mean()}"
+            + f" interp {getattr(hbox_out, fields[0]).mean()}"
+            + f" prog {getattr(hbox_prog, fields[0]).mean()}"
+        )
 
     return hbox_out
 
@@ -681,8 +780,7 @@ def compute_xray_source_field(
 
     # Check whether the boxes already exist
     if not regenerate:
-        with contextlib.suppress(OSError):
-            box.read(direc)
+        if _read_cached(box, direc):
             logger.info(
                 f"Existing z={redshift} xray_source boxes found and read in "
                 f"(seed={box.random_seed})."
@@ -696,18 +794,18 @@ def compute_xray_source_field(
 
     # now we need to find the closest halo box to the redshift of the shell
     cosmo_ap = inputs.cosmo_params.cosmo
-    cmd_zp = cosmo_ap.comoving_distance(redshift)
-    R_steps = np.arange(0, global_params.NUM_FILTER_STEPS_FOR_Ts)
-    R_factor = (global_params.R_XLy_MAX / R_min) ** (
+    # All distances here are plain floats in Mpc.
+    cmd_zp = cosmo_ap.comoving_distance(redshift).to_value("Mpc")
+    R_steps = np.arange(global_params.NUM_FILTER_STEPS_FOR_Ts, dtype=float)
+    R_range = R_min * (global_params.R_XLy_MAX / R_min) ** (
         R_steps / global_params.NUM_FILTER_STEPS_FOR_Ts
     )
-    R_range = un.Mpc * R_min * R_factor
     cmd_edges = cmd_zp + R_range  # comoving distance edges
-    # NOTE(jdavies) added the 'bounded' method since it seems there are some compatibility issues with astropy and scipy
-    # where astropy gives default bounds to a function with default unbounded minimization
-    zpp_edges = [
-        z_at_value(cosmo_ap.comoving_distance, d, method="bounded") for d in cmd_edges
-    ]
+
+    # Imported here, since the lightcones module itself depends on the drivers.
+    from ..lightcones import _redshifts_at_distances
+
+    zpp_edges = _redshifts_at_distances(cosmo_ap, cmd_edges)
     # the `average` redshift of the shell is the average of the
     # inner and outer redshifts (following the C code)
     zpp_avg = zpp_edges - np.diff(np.insert(zpp_edges, 0, redshift)) / 2
@@ -715,52 +813,90 @@ def compute_xray_source_field(
     # call the box the initialize the memory, since I give some values before computing
     box()
     final_box_computed = False
-    for i in range(global_params.NUM_FILTER_STEPS_FOR_Ts):
-        R_inner = R_range[i - 1].to("Mpc").value if i > 0 else 0
-        R_outer = R_range[i].to("Mpc").value
-
-        if zpp_avg[i] >= z_max:
-            box.filtered_sfr[i] = 0
-            box.filtered_sfr_mini[i] = 0
-            box.filtered_xray[i] = 0
-            box.mean_log10_Mcrit_LW[i] = inputs.astro_params.M_TURN  # minimum
-            logger.debug(f"ignoring Radius {i} which is above Z_HEAT_MAX")
-            continue
-
-        hbox_interp = interp_halo_boxes(
-            inputs,
-            hboxes[::-1],
-            ["halo_sfr", "halo_xray", "halo_sfr_mini", "log10_Mcrit_MCG_ave"],
-            zpp_avg[i],
+    # The halo boxes are interpolated in ascending order of redshift.
+    hboxes_ascending = hboxes[::-1]
+    # Find the pair of halo boxes to interpolate between for all the shells at once.
+    # The boxes have already been checked for compatibility with the inputs.
+    shell_in_range = zpp_avg < z_max
+    idx_desc = np.zeros(len(zpp_avg), dtype=int)
+    interp_param = np.zeros(len(zpp_avg))
+    if np.any(shell_in_range):
+        idx_desc[shell_in_range], interp_param[shell_in_range] = _halo_box_brackets(
+            hboxes_ascending, zpp_avg[shell_in_range]
         )
-
-        # if we have no halos we ignore the whole shell
-        if np.all(hbox_interp.halo_sfr + hbox_interp.halo_sfr_mini == 0):
-            box.filtered_sfr[i] = 0
-            box.filtered_sfr_mini[i] = 0
-            box.filtered_xray[i] = 0
-            box.mean_log10_Mcrit_LW[i] = hbox_interp.log10_Mcrit_MCG_ave
-            logger.debug(f"ignoring Radius {i} due to no stars")
-            continue
-
-        # HACK: so that I can compute in the loop multiple times
-        # since the array state is initialized already it shouldn't re-initialise
-        for k, state in box._array_state.items():
-            if state.initialized:
-                state.computed_in_mem = False
-
-        # we only want to call hooks at the end so we set a dummy hook here
-        hooks_in = hooks if i == global_params.NUM_FILTER_STEPS_FOR_Ts - 1 else {}
-
-        box = box.compute(
-            halobox=hbox_interp,
-            R_inner=R_inner,
-            R_outer=R_outer,
-            R_ct=i,
-            hooks=hooks_in,
+    # Shells above Z_HEAT_MAX are empty. Since zpp increases with the shell radius,
+    # they form a contiguous slab of outer shells, which is cleared in one go.
+    shell_above_max = ~shell_in_range
+    if np.any(shell_above_max):
+        box.filtered_sfr[shell_above_max] = 0
+        box.filtered_sfr_mini[shell_above_max] = 0
+        box.filtered_xray[shell_above_max] = 0
+        box.mean_log10_Mcrit_LW[shell_above_max] = inputs.astro_params.M_TURN  # minimum
+        logger.debug(
+            f"ignoring Radii {np.flatnonzero(shell_above_max)} which are above Z_HEAT_MAX"
         )
-        if i == global_params.NUM_FILTER_STEPS_FOR_Ts - 1:
-            final_box_computed = True
+    # Halo boxes that have been flushed to disk are memory-mapped rather than read in,
+    # so that only the parts of the (large) boxes that are used get paged in.
+    hbox_fields = ["halo_sfr", "halo_xray", "halo_sfr_mini", "log10_Mcrit_MCG_ave"]
+    for hbox in hboxes:
+        on_disk = [
+            k
+            for k in hbox_fields
+            if k in hbox._array_state
+            and not hbox._array_state[k].initialized
+            and hbox._array_state[k].on_disk
+        ]
+        if on_disk:
+            hbox.read(fname=hbox.path, keys=on_disk, mmap=True)
+
+    # The interpolated halo box of each shell re-uses the memory of the last one.
+    hbox_interp = None
+    # The same threads (if any) interpolate the halo boxes of every shell.
+    with _interp_pool(inputs, len(hbox_fields)) as pool:
+        for i in np.flatnonzero(shell_in_range).tolist():
+            R_inner = R_range[i - 1] if i > 0 else 0
+            R_outer = R_range[i]
+
+            hbox_interp = _interp_halo_box_pair(
+                inputs,
+                hboxes_ascending[idx_desc[i]],
+                hboxes_ascending[idx_desc[i] + 1],
+                hbox_fields,
+                zpp_avg[i],
+                interp_param[i],
+                out=hbox_interp,
+                pool=pool,
+            )
+
+            # if we have no halos we ignore the whole shell. The SFRs are non-negative,
+            # so this is checked without summing the boxes (and stops at the first box
+            # with any stars).
+            if not (hbox_interp.halo_sfr.any() or hbox_interp.halo_sfr_mini.any()):
+                box.filtered_sfr[i] = 0
+                box.filtered_sfr_mini[i] = 0
+                box.filtered_xray[i] = 0
+                box.mean_log10_Mcrit_LW[i] = hbox_interp.log10_Mcrit_MCG_ave
+                logger.debug(f"ignoring Radius {i} due to no stars")
+                continue
+
+            # HACK: so that I can compute in the loop multiple times
+            # since the array state is initialized already it shouldn't re-initialise
+            for k, state in box._array_state.items():
+                if state.initialized:
+                    state.computed_in_mem = False
+
+            # we only want to call hooks at the end so we set a dummy hook here
+            hooks_in = hooks if i == global_params.NUM_FILTER_STEPS_FOR_Ts - 1 else {}
+
+            box = box.compute(
+                halobox=hbox_interp,
+                R_inner=R_inner,
+                R_outer=R_outer,
+                R_ct=i,
+                hooks=hooks_in,
+            )
+            if i == global_params.NUM_FILTER_STEPS_FOR_Ts - 1:
+                final_box_computed = True
 
     # HACK: sometimes we don't compute on the last step
     # (if the first zpp > z_max or there are no halos at max R)
@@ -955,8 +1091,7 @@ def compute_ionization_field(
 
     # Check whether the boxes already exist
     if not regenerate:
-        with contextlib.suppress(OSError):
-            box.read(direc)
+        if _read_cached(box, direc):
             logger.info(
                 f"Existing z={redshift} ionized boxes found and read in (seed={box.random_seed})."
             )
@@ -984,21 +1119,13 @@ def compute_ionization_field(
 
     if not inputs.flag_options.USE_HALO_FIELD:
         # Construct an empty halo field to pass in to the function.
-        halobox = HaloBox(
-            redshift=0.0,
-            inputs=inputs,
-            dummy=True,
-        )
+        halobox = _dummy_box(HaloBox, inputs)
     elif halobox is None:
         raise ValueError("No halo box given but USE_HALO_FIELD=True")
 
     # Set empty spin temp box if necessary.
     if not inputs.flag_options.USE_TS_FLUCT:
-        spin_temp = TsBox(
-            redshift=0.0,
-            inputs=inputs,
-            dummy=True,
-        )
+        spin_temp = _dummy_box(TsBox, inputs)
     elif spin_temp is None:
         raise ValueError("No spin temperature box given but USE_TS_FLUCT=True")
 
@@ -1148,11 +1275,7 @@ def spin_temperature(
         if inputs.flag_options.USE_HALO_FIELD:
             raise ValueError("xray_source_box is required when USE_HALO_FIELD is True")
         else:
-            xray_source_box = XraySourceBox(
-                redshift=0.0,
-                inputs=inputs,
-                dummy=True,
-            )
+            xray_source_box = _dummy_box(XraySourceBox, inputs)
 
     # Set up the box without computing anything.
     box = TsBox(
@@ -1168,8 +1291,7 @@ def spin_temperature(
 
     # Check whether the boxes already exist on disk.
     if not regenerate:
-        with contextlib.suppress(OSError):
-            box.read(direc)
+        if _read_cached(box, direc):
             logger.info(
                 f"Existing z={redshift} spin_temp boxes found and read in "
                 f"(seed={box.random_seed})."
@@ -1181,11 +1303,7 @@ def spin_temperature(
     if previous_spin_temp is None:
         # We end up never even using this box, just need to define it
         # unallocated to be able to send into the C code.
-        previous_spin_temp = TsBox(
-            redshift=0.0,
-            inputs=inputs,
-            dummy=True,
-        )
+        previous_spin_temp = _dummy_box(TsBox, inputs)
 
     # Run the C Code
     return box.compute(
@@ -1245,11 +1363,7 @@ def brightness_temperature(
                 "You have USE_TS_FLUCT=True, but have not provided a spin_temp!"
             )
         else:
-            spin_temp = TsBox(
-                redshift=0.0,
-                inputs=inputs,
-                dummy=True,
-            )
+            spin_temp = _dummy_box(TsBox, inputs)
 
     box = BrightnessTemp(
         redshift=redshift,
@@ -1263,8 +1377,7 @@ def brightness_temperature(
 
     # Check whether the boxes already exist on disk.
     if not regenerate:
-        with contextlib.suppress(OSError):
-            box.read(direc)
+        if _read_cached(box, direc):
             logger.info(
                 f"Existing brightness_temp box found and read in (seed={box.random_seed})."
             )
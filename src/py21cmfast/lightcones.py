@@ -15,6 +15,7 @@ from functools import cached_property, partial
 from scipy.spatial.transform import Rotation
 from typing import Sequence
 
+from ._memo import FIFOCache
 from .drivers.coeval import Coeval
 from .wrapper.inputs import Planck18  # Not *quite* the same as astropy's Planck18
 from .wrapper.inputs import FlagOptions, UserParams
@@ -22,6 +23,47 @@ from .wrapper.inputs import FlagOptions, UserParams
 _LIGHTCONERS = {}
 _LENGTH = "length"
 
+# Tabulated comoving distance vs. redshift, keyed by cosmology (see _z_of_d_table).
+_Z_OF_D_TABLES = FIFOCache(maxsize=32)
+
+
+def _z_of_d_table(cosmo: FLRW, zmax: float) -> tuple[np.ndarray, np.ndarray]:
+    """Tabulate comoving distance (in Mpc) against redshift, from 0 to ``zmax``.
+
+    Tables are cached (for a limited number of cosmologies) and shared by everything
+    using the same cosmology. Astropy cosmologies are not hashable, so they are keyed
+    by their repr, which includes all their parameters.
+    """
+    key = (repr(cosmo), zmax)
+    if key not in _Z_OF_D_TABLES:
+        zgrid = np.geomspace(1, 1 + zmax, 8192) - 1
+        dgrid = cosmo.comoving_distance(zgrid).to_value(Mpc)
+        zgrid.flags.writeable = False
+        dgrid.flags.writeable = False
+        _Z_OF_D_TABLES[key] = (zgrid, dgrid)
+
+    return _Z_OF_D_TABLES[key]
+
+
+def _redshifts_at_distances(cosmo: FLRW, distances: np.ndarray) -> np.ndarray:
+    """Get the redshifts at the given comoving distances (in Mpc).
+
+    This inverts a cached, tabulated distance-redshift relation rather than
+    root-finding for every distance, which is very slow for long lightcones.
+    """
+    dmax = np.max(distances)
+    if not np.isfinite(dmax):
+        raise ValueError("Comoving distances must be finite.")
+
+    zmax = 100.0
+    while True:
+        zgrid, dgrid = _z_of_d_table(cosmo, zmax)
+        if dgrid[-1] >= dmax:
+            return np.interp(distances, dgrid, zgrid)
+        if zmax > 1e4:
+            raise ValueError(f"The distance {dmax} Mpc is beyond the horizon.")
+        zmax *= 2
+
 
 @attr.define(kw_only=True, slots=False)
 class Lightconer(ABC):
@@ -47,7 +89,13 @@ class Lightconer(ABC):
         default=Planck18, validator=attr.validators.instance_of(FLRW)
     )
 
-    _lc_redshifts: np.ndarray = attr.field(default=None, eq=False)
+    _lc_redshifts: np.ndarray = attr.field(
+        default=None,
+        eq=False,
+        converter=attr.converters.optional(
+            partial(np.ascontiguousarray, dtype=np.float64)
+        ),
+    )
     lc_distances: Quantity[_LENGTH] = attr.field(
         eq=attr.cmp_using(eq=partial(np.allclose, rtol=1e-5, atol=0))
     )
@@ -85,9 +133,13 @@ class Lightconer(ABC):
         if self._lc_redshifts is not None:
             return self._lc_redshifts
 
-        return np.array(
-            [z_at_value(self.cosmo.comoving_distance, d) for d in self.lc_distances]
-        )
+        return _redshifts_at_distances(self.cosmo, self.lc_distances.to_value(Mpc))
+
+    @cached_property
+    def lc_redshift_range(self) -> tuple[float, float]:
+        """The minimum and maximum redshifts of the lightcone slices."""
+        lcz = self.lc_redshifts
+        return float(lcz.min()), float(lcz.max())
 
     def get_lc_distances_in_pixels(self, resolution: Quantity[_LENGTH]):
         """Get the lightcone distances in pixels, given a resolution."""
@@ -198,7 +250,13 @@ class Lightconer(ABC):
 
         lc_distances = pixlcdist[lcidx]
 
-        for idx, lcd in zip(lcidx, lc_distances):
+        # The redshift interpolation acts on full slices, so it is done on plain
+        # arrays (in pixel units), which avoids the overhead of astropy units.
+        dc1_pix = dc1.to_value(pixel)
+        dc2_pix = dc2.to_value(pixel)
+        lc_distances_pix = lc_distances.to_value(pixel)
+
+        for idx, lcd, lcd_pix in zip(lcidx, lc_distances, lc_distances_pix):
             for q in self.quantities:
                 box1 = self.coeval_subselect(
                     lcd, getattr(c1, q), c1.user_params.cell_size
@@ -207,7 +265,12 @@ class Lightconer(ABC):
                     lcd, getattr(c2, q), c2.user_params.cell_size
                 )
                 box = self.redshift_interpolation(
-                    lcd, box1, box2, dc1, dc2, kind=self.interp_kinds.get(q, "mean")
+                    lcd_pix,
+                    box1,
+                    box2,
+                    dc1_pix,
+                    dc2_pix,
+                    kind=self.interp_kinds.get(q, "mean"),
                 )
 
                 yield q, idx, self.construct_lightcone(lcd, box)
@@ -232,11 +295,11 @@ class Lightconer(ABC):
 
                     interpolated_boxes = [
                         self.redshift_interpolation(
-                            lcd,
+                            lcd_pix,
                             box1,
                             box2,
-                            dc1,
-                            dc2,
+                            dc1_pix,
+                            dc2_pix,
                             kind=self.interp_kinds.get("velocity", "mean"),
                         )
                         for (box1, box2) in zip(boxes1, boxes2)
@@ -330,8 +393,8 @@ class RectilinearLightconer(Lightconer):
         """Sub-select the coeval slice corresponding to this coeval distance."""
         # This makes the back of the lightcone exactly line up with the back of the
         # coeval box at that redshift, modulo the index_offset.
-        lcpix = self.get_lc_distances_in_pixels(coeval_res)
-        lcidx = int((lcpix.max() - lcd + 1 * pixel).to_value(pixel))
+        lcpix_max = self.lc_distances.max().to(pixel, pixel_scale(coeval_res / pixel))
+        lcidx = int((lcpix_max - lcd + 1 * pixel).to_value(pixel))
         return coeval.take(-lcidx + self.index_offset, axis=2, mode="wrap")
 
     def construct_lightcone(
@@ -74,18 +74,11 @@ void cleanup_ComputeLF(){
 	initialised_ComputeLF = 0;
 }
 
-int ComputeLF(int nbins, UserParams *user_params, CosmoParams *cosmo_params, AstroParams *astro_params,
-               FlagOptions *flag_options, int component, int NUM_OF_REDSHIFT_FOR_LF, float *z_LF,
-               float *M_TURNs, double *M_uv_z, double *M_h_z, double *log10phi) {
-    /*
-        This is an API-level function and thus returns an int status.
-    */
-    int status;
-    Try{ // This try block covers the whole function.
-    // This NEEDS to be done every time, because the actual object passed in as
-    // user_params, cosmo_params etc. can change on each call, freeing up the memory.
-    initialise_ComputeLF(nbins, user_params,cosmo_params,astro_params,flag_options);
-
+// Fills the LF of a single population (component 1: ACGs, 2: MCGs). Requires initialise_ComputeLF
+// to have been called with the same nbins and parameters, and may Throw.
+static void compute_lf_component(int nbins, UserParams *user_params, CosmoParams *cosmo_params, AstroParams *astro_params,
+                                 int component, int NUM_OF_REDSHIFT_FOR_LF, float *z_LF,
+                                 float *M_TURNs, double *M_uv_z, double *M_h_z, double *log10phi) {
     int i,i_z;
     int i_unity, i_smth, mf, nbins_smth=7;
     double  dlnMhalo, lnMhalo_i, SFRparam, Muv_1, Muv_2, dMuvdMhalo;
@@ -253,6 +246,22 @@ int ComputeLF(int nbins, UserParams *user_params, CosmoParams *cosmo_params, Ast
             }
         }
     }
+}
+
+int ComputeLF(int nbins, UserParams *user_params, CosmoParams *cosmo_params, AstroParams *astro_params,
+               FlagOptions *flag_options, int component, int NUM_OF_REDSHIFT_FOR_LF, float *z_LF,
+               float *M_TURNs, double *M_uv_z, double *M_h_z, double *log10phi) {
+    /*
+        This is an API-level function and thus returns an int status.
+    */
+    int status;
+    Try{ // This try block covers the whole function.
+    // This NEEDS to be done every time, because the actual object passed in as
+    // user_params, cosmo_params etc. can change on each call, freeing up the memory.
+    initialise_ComputeLF(nbins, user_params,cosmo_params,astro_params,flag_options);
+
+    compute_lf_component(nbins, user_params, cosmo_params, astro_params, component,
+                         NUM_OF_REDSHIFT_FOR_LF, z_LF, M_TURNs, M_uv_z, M_h_z, log10phi);
 
 	cleanup_ComputeLF();
     } // End try
@@ -262,3 +271,28 @@ int ComputeLF(int nbins, UserParams *user_params, CosmoParams *cosmo_params, Ast
     return(0);
 
 }
+
+int ComputeLF_Both(int nbins, UserParams *user_params, CosmoParams *cosmo_params, AstroParams *astro_params,
+                   FlagOptions *flag_options, int NUM_OF_REDSHIFT_FOR_LF, float *z_LF,
+                   float *M_TURNs, float *M_TURNs_MINI, double *M_uv_z, double *M_h_z, double *log10phi,
+                   double *M_uv_z_MINI, double *M_h_z_MINI, double *log10phi_MINI) {
+    /*
+        Computes the LFs of both ACGs and MCGs, sharing a single set-up of the power spectrum and
+        sigma(M) tables between them. This is an API-level function and thus returns an int status.
+    */
+    int status;
+    Try{
+    initialise_ComputeLF(nbins, user_params,cosmo_params,astro_params,flag_options);
+
+    compute_lf_component(nbins, user_params, cosmo_params, astro_params, 1,
+                         NUM_OF_REDSHIFT_FOR_LF, z_LF, M_TURNs, M_uv_z, M_h_z, log10phi);
+    compute_lf_component(nbins, user_params, cosmo_params, astro_params, 2,
+                         NUM_OF_REDSHIFT_FOR_LF, z_LF, M_TURNs_MINI, M_uv_z_MINI, M_h_z_MINI, log10phi_MINI);
+
+	cleanup_ComputeLF();
+    } // End try
+    Catch(status){
+        return status;
+    }
+    return(0);
+}
@@ -67,6 +67,9 @@ void set_alphacons_params(double norm, double slope);
 /* Non-OutputStruct data products */
 int ComputeLF(int nbins,  UserParams *user_params,  CosmoParams *cosmo_params,  AstroParams *astro_params,
                 FlagOptions *flag_options, int component, int NUM_OF_REDSHIFT_FOR_LF, float *z_LF, float *M_TURNs, double *M_uv_z, double *M_h_z, double *log10phi);
+int ComputeLF_Both(int nbins,  UserParams *user_params,  CosmoParams *cosmo_params,  AstroParams *astro_params,
+                FlagOptions *flag_options, int NUM_OF_REDSHIFT_FOR_LF, float *z_LF, float *M_TURNs, float *M_TURNs_MINI,
+                double *M_uv_z, double *M_h_z, double *log10phi, double *M_uv_z_MINI, double *M_h_z_MINI, double *log10phi_MINI);
 
 float ComputeTau( UserParams *user_params,  CosmoParams *cosmo_params, int Npoints, float *redshifts, float *global_xHI);
 /*-----------------------------*/
@@ -783,7 +783,7 @@ void adjust_redshifts_for_photoncons(UserParams *user_params,
                     "more than 5 consecutive snapshots. This can be unstable, thus please check "\
                     "resultant history. Parameters are:\n"
                 );
-                #if LOG_LEVEL >= LOG_WARNING
+                #if LOG_LEVEL >= WARNING_LEVEL
                     writeAstroParams(flag_options, astro_params);
                 #endif
             }
@@ -1,13 +1,31 @@
 """Utilities for interacting with 21cmFAST data structures."""
 
+from collections.abc import Mapping
+from functools import cache, lru_cache
+from types import MappingProxyType
+
+from .c_21cmfast import ffi
 from .wrapper.outputs import InitialConditions, _OutputStructZ
 
 
+@cache
+def _get_struct_fieldnames(name: str, arrays_only: bool) -> frozenset[str]:
+    """Get the names of the fields of a C struct, without instantiating it."""
+    return frozenset(
+        fieldname
+        for fieldname, field in ffi.typeof(f"struct {name}").fields
+        if not arrays_only or field.type.kind == "pointer"
+    )
+
+
+@lru_cache(maxsize=8)
 def get_all_fieldnames(
     arrays_only=True, lightcone_only=False, as_dict=False
-) -> dict[str, str] | set[str]:
+) -> Mapping[str, str] | frozenset[str]:
     """Return all possible fieldnames in output structs.
 
+    The results are cached, and so are returned as read-only objects.
+
     Parameters
     ----------
     arrays_only : bool, optional
@@ -15,21 +33,22 @@ def get_all_fieldnames(
     lightcone_only : bool, optional
         Whether to only return fields from classes that evolve with redshift.
     as_dict : bool, optional
-        Whether to return results as a dictionary of ``quantity: class_name``.
-        Otherwise returns a set of quantities.
+        Whether to return results as a (read-only) dictionary of
+        ``quantity: class_name``. Otherwise returns a frozenset of quantities.
     """
-    classes = [cls(redshift=0, dummy=True) for cls in _OutputStructZ._implementations()]
+    classes = _OutputStructZ._implementations()
 
     if not lightcone_only:
-        classes.append(InitialConditions())
+        classes.append(InitialConditions)
 
-    attr = "pointer_fields" if arrays_only else "fieldnames"
+    fieldnames = {
+        cls.__name__: _get_struct_fieldnames(cls.__name__, arrays_only)
+        for cls in classes
+    }
 
     if as_dict:
-        return {
-            name: cls.__class__.__name__
-            for cls in classes
-            for name in getattr(cls, attr)
-        }
+        return MappingProxyType(
+            {name: clsname for clsname, names in fieldnames.items() for name in names}
+        )
     else:
-        return {name for cls in classes for name in getattr(cls, attr)}
+        return frozenset().union(*fieldnames.values())
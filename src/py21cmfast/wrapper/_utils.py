@@ -44,6 +44,54 @@ def asarray(ptr, shape):
     return array
 
 
+def empty_aligned(shape, dtype=np.float64, n: int = 64) -> np.ndarray:
+    """Get an uninitialized C-contiguous array whose data is aligned to ``n`` bytes.
+
+    NumPy only guarantees the alignment required by the dtype, so this over-allocates
+    a byte buffer and views it from the first suitably aligned address.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buf = np.empty(nbytes + n, dtype=np.uint8)
+    offset = -buf.ctypes.data % n
+    return buf[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+def as_aligned(x, dtype, n: int = 64) -> np.ndarray:
+    """Get ``x`` as a C-contiguous array of ``dtype`` aligned to ``n`` bytes.
+
+    The data is only copied if ``x`` does not already satisfy these.
+    """
+    arr = np.asarray(x, dtype=dtype)
+    if arr.flags.c_contiguous and arr.ctypes.data % n == 0:
+        return arr
+
+    out = empty_aligned(arr.shape, dtype, n)
+    out[...] = arr
+    return out
+
+
+_DTYPE2CPTR = {
+    np.dtype("f4"): "float *",
+    np.dtype("f8"): "double *",
+    np.dtype("i4"): "int *",
+}
+
+
+def as_cptr(arr: np.ndarray):
+    """Get a C pointer (of the type matching its dtype) to the data of ``arr``.
+
+    The array must be C-contiguous, since the C code indexes it as a flat buffer.
+    """
+    if not arr.flags.c_contiguous:
+        raise ValueError("Only C-contiguous arrays can be passed to C.")
+    try:
+        ctype = _DTYPE2CPTR[arr.dtype]
+    except KeyError:
+        raise TypeError(f"Cannot pass an array of dtype {arr.dtype} to C.") from None
+    return ffi.cast(ctype, ffi.from_buffer(arr))
+
+
 def _call_c_simple(fnc, *args):
     """Call a simple C function that just returns an object.
 
@@ -2,19 +2,21 @@
 
 import logging
 import numpy as np
-from functools import cache
-from scipy.interpolate import interp1d
 from typing import Literal, Sequence
 
+from .._memo import FIFOCache
 from ..c_21cmfast import ffi, lib
 from ..drivers.param_config import InputParameters
-from ._utils import _process_exitcode
+from ._utils import _process_exitcode, as_aligned, as_cptr, empty_aligned
 from .globals import global_params
 from .inputs import AstroParams, CosmoParams, FlagOptions, UserParams
 from .outputs import InitialConditions, PerturbHaloField
 
 logger = logging.getLogger(__name__)
 
+# Results of get_expected_nhalo, keyed by its arguments and the global parameters.
+_EXPECTED_NHALO_CACHE = FIFOCache(maxsize=256)
+
 
 def get_expected_nhalo(
     redshift: float,
@@ -32,7 +34,19 @@ def get_expected_nhalo(
     cosmo_params : :class:`~CosmoParams`
         Cosmological parameters.
     """
-    return lib.expected_nhalo(redshift, user_params.cstruct, cosmo_params.cstruct)
+    # This sets up the power spectrum and sigma(M) tables in C each time, so is cached
+    # for pipelines that walk the same redshifts repeatedly. It does not depend on the
+    # astrophysics, but the global parameters can change its result.
+    key = (round(float(redshift), 6), user_params, cosmo_params, repr(global_params))
+    try:
+        return _EXPECTED_NHALO_CACHE[key]
+    except KeyError:
+        pass
+
+    out = lib.expected_nhalo(redshift, user_params.cstruct, cosmo_params.cstruct)
+
+    _EXPECTED_NHALO_CACHE[key] = out
+    return out
 
 
 def get_halo_list_buffer_size(
@@ -95,15 +109,17 @@ def compute_tau(
     if len(redshifts) != len(global_xHI):
         raise ValueError("redshifts and global_xHI must have same length")
 
-    if not np.all(np.diff(redshifts) > 0):
-        raise ValueError("redshifts and global_xHI must be in ascending order")
+    # Convert the data to the right type (only copying if required, as it is only
+    # read by the C code)
+    redshifts = as_aligned(redshifts, np.float32)
+    global_xHI = as_aligned(global_xHI, np.float32)
 
-    # Convert the data to the right type
-    redshifts = np.array(redshifts, dtype="float32")
-    global_xHI = np.array(global_xHI, dtype="float32")
+    # Compare views of the redshifts the C code will see, rather than taking a diff.
+    if not (redshifts[1:] > redshifts[:-1]).all():
+        raise ValueError("redshifts and global_xHI must be in ascending order")
 
-    z = ffi.cast("float *", ffi.from_buffer(redshifts))
-    xHI = ffi.cast("float *", ffi.from_buffer(global_xHI))
+    z = as_cptr(redshifts)
+    xHI = as_cptr(global_xHI)
 
     # Run the C code
     return lib.ComputeTau(
@@ -111,6 +127,55 @@ def compute_tau(
     )
 
 
+def _interp_extrapolate(
+    x: np.ndarray,
+    xp: np.ndarray,
+    *fps: np.ndarray,
+    out: Sequence[np.ndarray | None] | None = None,
+) -> list[np.ndarray]:
+    """Linearly interpolate each ``fp(xp)`` onto ``x``, extrapolating beyond ``xp``.
+
+    This is equivalent to ``interp1d(xp[i], fp[i], fill_value="extrapolate")(x)`` for
+    each row ``i`` of ``xp`` and of each array in ``fps``, with the end segments used
+    for the extrapolation. As in ``interp1d``, each ``x`` is bracketed by the first
+    of any repeated values of ``xp`` it is equal to (the C code repeats the magnitude
+    10 for unresolved bins), so that the same segments are used. The bracketing
+    indices are found once for all the ``fps``, and the interpolation is done for all
+    rows at once. The result for each of the ``fps`` is written into the
+    corresponding array of ``out``, if given.
+    """
+    order = np.argsort(xp, axis=-1, kind="stable")
+    xp = np.take_along_axis(xp, order, axis=-1)
+
+    # Index of the upper end of the segment each x falls in (or is extrapolated from).
+    hi = np.empty((len(xp), len(x)), dtype=np.intp)
+    for i, row in enumerate(xp):
+        hi[i] = np.searchsorted(row, x, side="left")
+    np.clip(hi, 1, xp.shape[-1] - 1, out=hi)
+    lo = hi - 1
+
+    x0 = np.take_along_axis(xp, lo, axis=-1)
+    dx = np.take_along_axis(xp, hi, axis=-1) - x0
+    offset = x - x0
+
+    results = []
+    for fp, dest in zip(fps, out or [None] * len(fps)):
+        fp = np.take_along_axis(fp, order, axis=-1)
+        f0 = np.take_along_axis(fp, lo, axis=-1)
+        slope = np.take_along_axis(fp, hi, axis=-1)
+        slope -= f0
+        # Like interp1d, a segment of zero length gives a non-finite slope.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope /= dx
+            slope *= offset
+        if dest is None:
+            slope += f0
+            results.append(slope)
+        else:
+            results.append(np.add(slope, f0, out=dest))
+    return results
+
+
 def compute_luminosity_function(
     *,
     redshifts: Sequence[float],
@@ -160,7 +225,8 @@ def compute_luminosity_function(
     flag_options = inputs.flag_options
     astro_params = inputs.astro_params
 
-    redshifts = np.array(redshifts, dtype="float32")
+    # These inputs are only read by the C code, so only copy them if required.
+    redshifts = as_aligned(redshifts, np.float32)
     if flag_options.USE_MINI_HALOS:
         if component in ["both", "acg"]:
             if mturnovers is None:
@@ -169,12 +235,12 @@ def compute_luminosity_function(
                     "specify mturnovers!"
                 )
 
-            mturnovers = np.array(mturnovers, dtype=np.float32)
             if len(mturnovers) != len(redshifts):
                 raise ValueError(
                     f"mturnovers ({len(mturnovers)}) does not match the length of "
                     f"redshifts ({len(redshifts)})"
                 )
+            mturnovers = as_aligned(mturnovers, np.float32)
         if component in ["both", "mcg"]:
             if mturnovers_mini is None:
                 raise ValueError(
@@ -182,44 +248,72 @@ def compute_luminosity_function(
                     "specify mturnovers_MINI!"
                 )
 
-            mturnovers_mini = np.array(mturnovers_mini, dtype="float32")
             if len(mturnovers_mini) != len(redshifts):
                 raise ValueError(
-                    f"mturnovers_MINI ({len(mturnovers)}) does not match the length of "
-                    f"redshifts ({len(redshifts)})"
+                    f"mturnovers_MINI ({len(mturnovers_mini)}) does not match the "
+                    f"length of redshifts ({len(redshifts)})"
                 )
+            mturnovers_mini = as_aligned(mturnovers_mini, np.float32)
 
     else:
-        mturnovers = (
-            np.zeros(len(redshifts), dtype=np.float32) + 10**astro_params.M_TURN
-        )
+        mturnovers = empty_aligned(len(redshifts), np.float32)
+        mturnovers.fill(astro_params.cdict["M_TURN"])
         component = "acg"
 
-    lfunc = np.zeros(len(redshifts) * nbins)
-    Muvfunc = np.zeros(len(redshifts) * nbins)
-    Mhfunc = np.zeros(len(redshifts) * nbins)
+    # The C code fills every element of the output buffers, so they needn't be zeroed.
+    # They (and the inputs) are aligned to cache lines for the C code.
+    lfunc = empty_aligned((len(redshifts), nbins))
+    Muvfunc = empty_aligned((len(redshifts), nbins))
+    Mhfunc = empty_aligned((len(redshifts), nbins))
 
-    lfunc.shape = (len(redshifts), nbins)
-    Muvfunc.shape = (len(redshifts), nbins)
-    Mhfunc.shape = (len(redshifts), nbins)
+    c_Muvfunc = as_cptr(Muvfunc)
+    c_Mhfunc = as_cptr(Mhfunc)
+    c_lfunc = as_cptr(lfunc)
 
-    c_Muvfunc = ffi.cast("double *", ffi.from_buffer(Muvfunc))
-    c_Mhfunc = ffi.cast("double *", ffi.from_buffer(Mhfunc))
-    c_lfunc = ffi.cast("double *", ffi.from_buffer(lfunc))
+    lfunc_MINI = empty_aligned((len(redshifts), nbins))
+    Muvfunc_MINI = empty_aligned((len(redshifts), nbins))
+    Mhfunc_MINI = empty_aligned((len(redshifts), nbins))
 
-    lfunc_MINI = np.zeros(len(redshifts) * nbins)
-    Muvfunc_MINI = np.zeros(len(redshifts) * nbins)
-    Mhfunc_MINI = np.zeros(len(redshifts) * nbins)
+    c_Muvfunc_MINI = as_cptr(Muvfunc_MINI)
+    c_Mhfunc_MINI = as_cptr(Mhfunc_MINI)
+    c_lfunc_MINI = as_cptr(lfunc_MINI)
 
-    lfunc_MINI.shape = (len(redshifts), nbins)
-    Muvfunc_MINI.shape = (len(redshifts), nbins)
-    Mhfunc_MINI.shape = (len(redshifts), nbins)
+    if component == "both":
+        # Run the C code for both components at once, sharing its set-up. Note that
+        # the components cannot be computed concurrently (even though CFFI releases
+        # the GIL), since ComputeLF keeps its splines and tables in global state.
+        errcode = lib.ComputeLF_Both(
+            nbins,
+            user_params.cstruct,
+            cosmo_params.cstruct,
+            astro_params.cstruct,
+            flag_options.cstruct,
+            len(redshifts),
+            as_cptr(redshifts),
+            as_cptr(mturnovers),
+            as_cptr(mturnovers_mini),
+            c_Muvfunc,
+            c_Mhfunc,
+            c_lfunc,
+            c_Muvfunc_MINI,
+            c_Mhfunc_MINI,
+            c_lfunc_MINI,
+        )
 
-    c_Muvfunc_MINI = ffi.cast("double *", ffi.from_buffer(Muvfunc_MINI))
-    c_Mhfunc_MINI = ffi.cast("double *", ffi.from_buffer(Mhfunc_MINI))
-    c_lfunc_MINI = ffi.cast("double *", ffi.from_buffer(lfunc_MINI))
+        _process_exitcode(
+            errcode,
+            lib.ComputeLF_Both,
+            (
+                nbins,
+                user_params.cstruct,
+                cosmo_params.cstruct,
+                astro_params.cstruct,
+                flag_options.cstruct,
+                len(redshifts),
+            ),
+        )
 
-    if component in ("both", "acg"):
+    if component == "acg":
         # Run the C code
         errcode = lib.ComputeLF(
             nbins,
@@ -229,8 +323,8 @@ def compute_luminosity_function(
             flag_options.cstruct,
             1,
             len(redshifts),
-            ffi.cast("float *", ffi.from_buffer(redshifts)),
-            ffi.cast("float *", ffi.from_buffer(mturnovers)),
+            as_cptr(redshifts),
+            as_cptr(mturnovers),
             c_Muvfunc,
             c_Mhfunc,
             c_lfunc,
@@ -250,7 +344,7 @@ def compute_luminosity_function(
             ),
         )
 
-    if component in ("both", "mcg"):
+    if component == "mcg":
         # Run the C code
         errcode = lib.ComputeLF(
             nbins,
@@ -260,8 +354,8 @@ def compute_luminosity_function(
             flag_options.cstruct,
             2,
             len(redshifts),
-            ffi.cast("float *", ffi.from_buffer(redshifts)),
-            ffi.cast("float *", ffi.from_buffer(mturnovers_mini)),
+            as_cptr(redshifts),
+            as_cptr(mturnovers_mini),
             c_Muvfunc_MINI,
             c_Mhfunc_MINI,
             c_lfunc_MINI,
@@ -283,52 +377,43 @@ def compute_luminosity_function(
 
     if component == "both":
         # redo the Muv range using the faintest (most likely MINI) and the brightest (most likely massive)
-        lfunc_all = np.zeros(len(redshifts) * nbins)
-        Muvfunc_all = np.zeros(len(redshifts) * nbins)
-        Mhfunc_all = np.zeros(len(redshifts) * nbins * 2)
-
-        lfunc_all.shape = (len(redshifts), nbins)
-        Muvfunc_all.shape = (len(redshifts), nbins)
-        Mhfunc_all.shape = (len(redshifts), nbins, 2)
-
-        for iz in range(len(redshifts)):
-            Muvfunc_all[iz] = np.linspace(
-                np.min([Muvfunc.min(), Muvfunc_MINI.min()]),
-                np.max([Muvfunc.max(), Muvfunc_MINI.max()]),
-                nbins,
-            )
-            lfunc_all[iz] = np.log10(
-                10
-                ** (
-                    interp1d(Muvfunc[iz], lfunc[iz], fill_value="extrapolate")(
-                        Muvfunc_all[iz]
-                    )
-                )
-                + 10
-                ** (
-                    interp1d(
-                        Muvfunc_MINI[iz], lfunc_MINI[iz], fill_value="extrapolate"
-                    )(Muvfunc_all[iz])
-                )
-            )
-            Mhfunc_all[iz] = np.array(
-                [
-                    interp1d(Muvfunc[iz], Mhfunc[iz], fill_value="extrapolate")(
-                        Muvfunc_all[iz]
-                    ),
-                    interp1d(
-                        Muvfunc_MINI[iz], Mhfunc_MINI[iz], fill_value="extrapolate"
-                    )(Muvfunc_all[iz]),
-                ],
-            ).T
-        lfunc_all[lfunc_all <= -30] = np.nan
+        # The same magnitude bins (spanning both components at all redshifts) are
+        # used at every redshift, and every redshift is interpolated at once.
+        Muvfunc_all = np.empty((len(redshifts), nbins))
+        Muvfunc_all[:] = np.linspace(
+            min(Muvfunc.min(), Muvfunc_MINI.min()),
+            max(Muvfunc.max(), Muvfunc_MINI.max()),
+            nbins,
+        )
+        # The halo masses of each component are written straight into their slot.
+        Mhfunc_all = np.empty((len(redshifts), nbins, 2))
+        lfunc_acg, _ = _interp_extrapolate(
+            Muvfunc_all[0], Muvfunc, lfunc, Mhfunc, out=(None, Mhfunc_all[..., 0])
+        )
+        lfunc_mcg, _ = _interp_extrapolate(
+            Muvfunc_all[0],
+            Muvfunc_MINI,
+            lfunc_MINI,
+            Mhfunc_MINI,
+            out=(None, Mhfunc_all[..., 1]),
+        )
+
+        # log10(10**lf + 10**lf_mini), without overflowing.
+        ln10 = np.log(10)
+        lfunc_acg *= ln10
+        lfunc_mcg *= ln10
+        lfunc_all = np.logaddexp(lfunc_acg, lfunc_mcg, out=lfunc_acg)
+        lfunc_all /= ln10
+
+        # The C code sets log10phi to -30 where the LF is unresolved: mask it in place.
+        np.copyto(lfunc_all, np.nan, where=lfunc_all <= -30)
         return Muvfunc_all, Mhfunc_all, lfunc_all
     elif component == "acg":
 
-        lfunc[lfunc <= -30] = np.nan
+        np.copyto(lfunc, np.nan, where=lfunc <= -30)
         return Muvfunc, Mhfunc, lfunc
     elif component == "mcg":
-        lfunc_MINI[lfunc_MINI <= -30] = np.nan
+        np.copyto(lfunc_MINI, np.nan, where=lfunc_MINI <= -30)
         return Muvfunc_MINI, Mhfunc_MINI, lfunc_MINI
     else:
         raise ValueError(
@@ -336,7 +421,10 @@ def compute_luminosity_function(
         )
 
 
-@cache
+# The box dimensions for which FFTW wisdoms have been constructed in this process.
+_FFTW_WISDOMS_CONSTRUCTED = set()
+
+
 def construct_fftw_wisdoms(
     *,
     user_params: UserParams | dict | None = None,
@@ -344,6 +432,8 @@ def construct_fftw_wisdoms(
 ) -> int:
     """Construct all necessary FFTW wisdoms.
 
+    This is only done once per process for each set of box dimensions.
+
     Parameters
     ----------
     user_params : :class:`~inputs.UserParams`
@@ -351,14 +441,28 @@ def construct_fftw_wisdoms(
 
     """
     user_params = UserParams.new(user_params)
-    cosmo_params = CosmoParams.new(cosmo_params)
 
-    # Run the C code
-    if user_params.USE_FFTW_WISDOM:
-        return lib.CreateFFTWWisdoms(user_params.cstruct, cosmo_params.cstruct)
-    else:
+    if not user_params.USE_FFTW_WISDOM:
+        return 0
+
+    # The wisdoms depend only on the shapes of the boxes and the number of threads
+    # (not e.g. the cosmology), so different parameters can often share them.
+    key = (
+        user_params.DIM,
+        user_params.HII_DIM,
+        user_params.NON_CUBIC_FACTOR,
+        user_params.N_THREADS,
+    )
+    if key in _FFTW_WISDOMS_CONSTRUCTED:
         return 0
 
+    # Run the C code
+    cosmo_params = CosmoParams.new(cosmo_params)
+    status = lib.CreateFFTWWisdoms(user_params.cstruct, cosmo_params.cstruct)
+    if status == 0:
+        _FFTW_WISDOMS_CONSTRUCTED.add(key)
+    return status
+
 
 # Below are evaulations of certain integrals and interpolation tables used at lower levels in the code.
 #  They are mostly used for testing but may be useful in some post-processing applications
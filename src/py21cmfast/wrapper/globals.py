@@ -295,7 +295,9 @@ class GlobalParams(StructInstanceWrapper):
         >>>     run_lightcone(redshift=7)
         """
         prev = {}
-        this_attr_upper = {k.upper(): k for k in self.keys()}
+        # Most calls (e.g. every call to a driver function) don't set anything, so
+        # only build the case-insensitive lookup if we need it.
+        this_attr_upper = {k.upper(): k for k in self.keys()} if kwargs else {}
 
         for k, val in kwargs.items():
             if k.upper() not in this_attr_upper:
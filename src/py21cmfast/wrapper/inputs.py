@@ -22,9 +22,11 @@ from astropy.cosmology import FLRW, Planck15
 from attrs import converters, define
 from attrs import field as _field
 from attrs import validators
+from functools import cached_property
 
 from .._cfg import config
 from .._data import DATA_PATH
+from .._memo import FIFOCache
 from ..c_21cmfast import ffi, lib
 from .globals import global_params
 from .structs import InputStruct
@@ -82,6 +84,9 @@ Planck18 = Planck15.clone(
     name="Planck18",
 )
 
+# CosmoParams created by CosmoParams.from_astropy.
+_FROM_ASTROPY_CACHE = FIFOCache(maxsize=16)
+
 
 @define(frozen=True, kw_only=True)
 class CosmoParams(InputStruct):
@@ -123,7 +128,7 @@ class CosmoParams(InputStruct):
         """Omega lambda, dark energy density."""
         return 1 - self.OMm
 
-    @property
+    @cached_property
     def cosmo(self):
         """An astropy cosmology object for this cosmology."""
         return self._base_cosmo.clone(
@@ -140,10 +145,27 @@ class CosmoParams(InputStruct):
         Pass SIGMA_8 and POWER_INDEX as kwargs if you want to override the default
         values.
         """
-        return cls(
+        # The same astropy cosmology is often converted many times (e.g. in parameter
+        # sweeps), so re-use the (immutable) result. FLRW objects are not necessarily
+        # hashable, so they are keyed by id: this can't be re-used while the cached
+        # instance holds a reference to the cosmology.
+        key = (cls, id(cosmo), cosmo.h, cosmo.Om0, cosmo.Ob0, *sorted(kwargs.items()))
+        try:
+            return _FROM_ASTROPY_CACHE[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable kwargs: no caching.
+            key = None
+
+        out = cls(
             hlittle=cosmo.h, OMm=cosmo.Om0, OMb=cosmo.Ob0, base_cosmo=cosmo, **kwargs
         )
 
+        if key is not None:
+            _FROM_ASTROPY_CACHE[key] = out
+        return out
+
 
 @define(frozen=True, kw_only=True)
 class UserParams(InputStruct):
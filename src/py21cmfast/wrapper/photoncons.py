@@ -26,11 +26,10 @@ The application of the model is controlled by the flag option PHOTON_CONS_TYPE,
 
 import logging
 import numpy as np
-from copy import deepcopy
 from scipy.optimize import curve_fit
 
 from ..c_21cmfast import ffi, lib
-from ._utils import _process_exitcode
+from ._utils import _process_exitcode, as_cptr
 from .inputs import AstroParams, CosmoParams, FlagOptions, UserParams, global_params
 
 logger = logging.getLogger(__name__)
@@ -91,8 +90,8 @@ def _calibrate_photon_conservation_correction(
     redshifts_estimate = np.array(redshifts_estimate, dtype="float64")
     nf_estimate = np.array(nf_estimate, dtype="float64")
 
-    z = ffi.cast("double *", ffi.from_buffer(redshifts_estimate))
-    xHI = ffi.cast("double *", ffi.from_buffer(nf_estimate))
+    z = as_cptr(redshifts_estimate)
+    xHI = as_cptr(nf_estimate)
 
     logger.debug(f"PhotonCons nf estimates: {nf_estimate}")
     return lib.PhotonCons_Calibration(z, xHI, NSpline)
@@ -138,16 +137,16 @@ def _get_photon_nonconservation_data():
     IntVal2 = np.array(np.zeros(1), dtype="int32")
     IntVal3 = np.array(np.zeros(1), dtype="int32")
 
-    c_z_at_Q = ffi.cast("double *", ffi.from_buffer(data[0]))
-    c_Qval = ffi.cast("double *", ffi.from_buffer(data[1]))
-    c_z_cal = ffi.cast("double *", ffi.from_buffer(data[2]))
-    c_nf_cal = ffi.cast("double *", ffi.from_buffer(data[3]))
-    c_PC_nf = ffi.cast("double *", ffi.from_buffer(data[4]))
-    c_PC_deltaz = ffi.cast("double *", ffi.from_buffer(data[5]))
+    c_z_at_Q = as_cptr(data[0])
+    c_Qval = as_cptr(data[1])
+    c_z_cal = as_cptr(data[2])
+    c_nf_cal = as_cptr(data[3])
+    c_PC_nf = as_cptr(data[4])
+    c_PC_deltaz = as_cptr(data[5])
 
-    c_int_NQ = ffi.cast("int *", ffi.from_buffer(IntVal1))
-    c_int_NC = ffi.cast("int *", ffi.from_buffer(IntVal2))
-    c_int_NP = ffi.cast("int *", ffi.from_buffer(IntVal3))
+    c_int_NQ = as_cptr(IntVal1)
+    c_int_NC = as_cptr(IntVal2)
+    c_int_NP = as_cptr(IntVal3)
 
     # Run the C code
     errcode = lib.ObtainPhotonConsData(
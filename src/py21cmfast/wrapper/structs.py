@@ -17,6 +17,7 @@ from typing import Any, Sequence
 
 from .. import __version__
 from .._cfg import config
+from .._memo import FIFOCache
 from ..c_21cmfast import ffi, lib
 from ._utils import (
     asarray,
@@ -91,6 +92,10 @@ class StructWrapper:
         }
 
 
+# The filled C structs of recently-used InputStructs, keyed by the (hashable) instance.
+_INPUT_CSTRUCTS = FIFOCache(maxsize=64)
+
+
 @attrs.define(frozen=True, kw_only=True)
 class InputStruct:
     """
@@ -133,6 +138,9 @@ class InputStruct:
         """
         if isinstance(x, dict):
             return cls(**x, **kwargs)
+        elif type(x) is cls and not kwargs:
+            # Instances are immutable, so there is no need to copy (and re-validate).
+            return x
         elif isinstance(x, InputStruct):
             return x.clone(**kwargs)
         elif x is None:
@@ -150,6 +158,16 @@ class InputStruct:
     @cached_property
     def cstruct(self) -> StructWrapper:
         """The object pointing to the memory accessed by C-code for this struct."""
+        # Equal instances have identical C structs (which the C code only reads), so
+        # they share the one that was filled first.
+        try:
+            return _INPUT_CSTRUCTS[self].cstruct
+        except KeyError:
+            cacheable = True
+        except TypeError:
+            # Some field is unhashable.
+            cacheable = False
+
         cdict = self.cdict
         for k in self.struct.fieldnames:
             val = cdict[k]
@@ -160,6 +178,8 @@ class InputStruct:
 
             setattr(self.struct.cstruct, k, val)
 
+        if cacheable:
+            _INPUT_CSTRUCTS[self] = self.struct
         return self.struct.cstruct
 
     def clone(self, **kwargs):
@@ -351,6 +371,18 @@ class OutputStruct(metaclass=ABCMeta):
         logger.info(f"All paths that defined {self} have been deleted on disk.")
         return None
 
+    @property
+    def is_cached(self) -> bool:
+        """Whether all the arrays computed in memory are also stored on disk.
+
+        If so, they can be purged from memory (e.g. with :meth:`prepare`) without
+        losing any information.
+        """
+        return all(
+            state.on_disk or not state.computed_in_mem
+            for state in self._array_state.values()
+        )
+
     @abstractmethod
     def _get_box_structures(self) -> dict[str, dict | tuple[int]]:
         """Return a dictionary of names mapping to shapes for each array in the struct.
@@ -431,6 +463,20 @@ class OutputStruct(metaclass=ABCMeta):
         """Return the C structure, will initialise if not already initialised."""
         return self.cstruct
 
+    def __getstate__(self):
+        """Return the state of the instance, without the (unpicklable) C struct."""
+        return {
+            k: v for k, v in self.__dict__.items() if k not in ("struct", "cstruct")
+        }
+
+    def __setstate__(self, state):
+        """Restore a pickled instance. The C struct is re-made when it is next used."""
+        self.__dict__.update(state)
+
+        # Arrays allocated in C are copied when pickled, so they are now owned by Python.
+        for k in self._c_based_pointers:
+            self._array_state[k].c_memory = False
+
     def __expose(self):
         """Expose the non-array primitives of the ctype to the top-level object."""
         for k in self.struct.primitive_fields:
@@ -795,6 +841,7 @@ class OutputStruct(metaclass=ABCMeta):
         direc: str | Path | None = None,
         fname: str | Path | None | h5py.File | h5py.Group = None,
         keys: Sequence[str] | None = (),
+        mmap: bool = False,
     ):
         """
         Try find and read existing boxes from cache, which match the parameters of this instance.
@@ -810,6 +857,11 @@ class OutputStruct(metaclass=ABCMeta):
         keys
             The names of boxes to read in (can be a subset). By default, read nothing.
             If `None` is explicitly passed, read everything
+        mmap
+            Whether to memory-map the boxes from the file (copy-on-write) instead of
+            reading them into memory, so that only the parts of them that are used
+            are paged in. Boxes that are not stored contiguously in the file (e.g.
+            chunked or compressed) are read in as usual.
         """
         if not isinstance(fname, (h5py.File, h5py.Group)):
             pth = self._get_path(direc, fname)
@@ -832,7 +884,8 @@ class OutputStruct(metaclass=ABCMeta):
             for k in boxes.keys():
                 self._array_state[k].on_disk = True
                 if k in keys:
-                    setattr(self, k, boxes[k][...])
+                    ary = _mmap_dataset(boxes[k]) if mmap else None
+                    setattr(self, k, boxes[k][...] if ary is None else ary)
                     self._array_state[k].computed_in_mem = True
                     setattr(self.cstruct, k, self._ary2buf(getattr(self, k)))
 
@@ -910,18 +963,15 @@ class OutputStruct(metaclass=ABCMeta):
 
     @classmethod
     def _read_inputs(cls, grp: h5py.File | h5py.Group, safe=True):
-        input_classes = [c.__name__ for c in InputStruct.__subclasses__()]
+        input_classes = {c.__name__: c for c in InputStruct.__subclasses__()}
 
         # Read the input parameter dictionaries from file.
         kwargs = {}
         for k in cls._inputs:
             kfile = k.lstrip("_")
-            input_class_name = snake_to_camel(kfile)
+            kls = input_classes.get(snake_to_camel(kfile))
 
-            if input_class_name in input_classes:
-                kls = InputStruct.__subclasses__()[
-                    input_classes.index(input_class_name)
-                ]
+            if kls is not None:
                 subgrp = grp[kfile]
                 dct = dict(subgrp.attrs)
                 kwargs[k] = kls.from_subdict(dct, safe=safe)
@@ -1195,6 +1245,28 @@ class OutputStruct(metaclass=ABCMeta):
                 lib.free(getattr(self.cstruct, k))
 
 
+def _mmap_dataset(dset: h5py.Dataset) -> np.memmap | None:
+    """Memory-map an HDF5 dataset (copy-on-write), if it is stored contiguously.
+
+    Returns None if the dataset can't be mapped directly.
+    """
+    if (
+        dset.file.driver != "sec2"
+        or dset.chunks is not None
+        or dset.size == 0
+        or not dset.dtype.isnative
+    ):
+        return None
+
+    offset = dset.id.get_offset()
+    if offset is None:
+        return None
+
+    return np.memmap(
+        dset.file.filename, dtype=dset.dtype, mode="c", offset=offset, shape=dset.shape
+    )
+
+
 class StructInstanceWrapper:
     """A wrapper for *instances* of C structs.
 
@@ -1231,7 +1303,7 @@ class StructInstanceWrapper:
 
     def keys(self):
         """Return a list of names of elements in the struct."""
-        return [nm for nm, tp in self.items()]
+        return [nm for nm, tp in self._ffi.typeof(self._cobj).fields]
 
     def __repr__(self):
         """Return a unique representation of the instance."""
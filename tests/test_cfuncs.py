@@ -38,6 +38,43 @@ def test_run_lf():
     assert lf_minih.shape == (3, 100)
 
 
+def test_lf_both_matches_interp1d():
+    """The merged LF should be the components interpolated as by interp1d."""
+    from scipy.interpolate import interp1d
+
+    inputs = p21c.InputParameters.from_template("mini", random_seed=9)
+    kw = {
+        "redshifts": [7, 8, 9],
+        "nbins": 100,
+        "inputs": inputs,
+        "mturnovers": [7.0, 7.0, 7.0],
+        "mturnovers_mini": [5.0, 5.0, 5.0],
+    }
+    muv_acg, mh_acg, lf_acg = p21c.compute_luminosity_function(component="acg", **kw)
+    muv_mcg, mh_mcg, lf_mcg = p21c.compute_luminosity_function(component="mcg", **kw)
+    muv, mh, lf = p21c.compute_luminosity_function(component="both", **kw)
+
+    # The components are returned with their unresolved bins (set to -30 by the C
+    # code) masked, whereas they are merged unmasked.
+    lf_acg = np.nan_to_num(lf_acg, nan=-30)
+    lf_mcg = np.nan_to_num(lf_mcg, nan=-30)
+
+    for iz in range(3):
+        expected = np.log10(
+            10 ** interp1d(muv_acg[iz], lf_acg[iz], fill_value="extrapolate")(muv[iz])
+            + 10 ** interp1d(muv_mcg[iz], lf_mcg[iz], fill_value="extrapolate")(muv[iz])
+        )
+        expected[expected <= -30] = np.nan
+        np.testing.assert_allclose(lf[iz], expected, equal_nan=True)
+
+        for i, (muv_c, mh_c) in enumerate([(muv_acg, mh_acg), (muv_mcg, mh_mcg)]):
+            np.testing.assert_allclose(
+                mh[iz, :, i],
+                interp1d(muv_c[iz], mh_c[iz], fill_value="extrapolate")(muv[iz]),
+                equal_nan=True,
+            )
+
+
 def test_run_tau():
     inputs = p21c.InputParameters(random_seed=9)
     tau = p21c.compute_tau(
@@ -155,6 +155,18 @@ def test_lightcone_quantities(
 #     assert "coeval_callback computation failed on first trial" in str(excinfo.value)
 
 
+def test_lightcone_redshifts_match_z_at_value(lc):
+    from astropy.cosmology import z_at_value
+
+    expected = np.array(
+        [
+            z_at_value(lc.cosmo_params.cosmo.comoving_distance, d)
+            for d in lc.lightcone_distances
+        ]
+    )
+    np.testing.assert_allclose(lc.lightcone_redshifts, expected, rtol=1e-6)
+
+
 def test_lightcone_coords(lc):
     assert lc.lightcone_coords.shape == (lc.lightcone_distances.shape[0],)
     assert lc.lightcone_coords[0] == 0.0
@@ -214,6 +226,39 @@ def test_lc_with_lightcone_filename(ic, rectlcn, default_input_struct_lc, tmpdir
     fname.unlink()
 
 
+def test_lc_parallel_perturb_fields(rectlcn, ic, default_input_struct_lc, lc):
+    _, _, _, lc_parallel = p21c.exhaust_lightcone(
+        lightconer=rectlcn,
+        initial_conditions=ic,
+        inputs=default_input_struct_lc,
+        regenerate=True,
+        write=False,
+        n_processes=2,
+    )
+
+    assert lc_parallel == lc
+    np.testing.assert_allclose(lc_parallel.brightness_temp, lc.brightness_temp)
+
+
+@pytest.mark.parametrize("always_purge", [False, True])
+def test_lc_minimize_memory(rectlcn, default_input_struct_lc, always_purge):
+    inputs = default_input_struct_lc.evolve_input_structs(MINIMIZE_MEMORY=True)
+    ic = p21c.compute_initial_conditions(inputs=inputs, write=False, regenerate=True)
+    assert not ic.is_cached
+
+    _, _, _, lc = p21c.exhaust_lightcone(
+        lightconer=rectlcn,
+        initial_conditions=ic,
+        inputs=inputs,
+        always_purge=always_purge,
+        regenerate=True,
+        write=False,
+    )
+
+    assert lc.brightness_temp.shape == rectlcn.get_shape(inputs.user_params)
+    assert np.all(np.isfinite(lc.brightness_temp))
+
+
 def test_lc_partial_eval(rectlcn, ic, default_input_struct_lc, tmpdirec, lc):
     fname = tmpdirec / "lightcone_partial.h5"
 
@@ -233,6 +278,10 @@ def test_lc_partial_eval(rectlcn, ic, default_input_struct_lc, tmpdirec, lc):
     assert partial._current_redshift <= 20.0
     assert partial._current_redshift > 15.0
 
+    # Stopping early releases the checkpoint file.
+    lc_gen.close()
+    assert partial._checkpoint_file is None
+
     _, _, _, finished = p21c.exhaust_lightcone(
         lightconer=rectlcn,
         initial_conditions=ic,
@@ -146,6 +146,32 @@ def test_lightcone_roundtrip(test_direc, lc):
     assert np.all(np.isclose(lc.brightness_temp, lc2.brightness_temp))
 
 
+def test_lightcone_read_is_lazy(test_direc, lc):
+    fname = lc.save(test_direc / "lazy_lightcone.h5")
+    lc2 = LightCone.read(fname)
+
+    # Getting the shape or checking membership should not require reading any lightcone.
+    assert lc2.shape == lc.shape
+    assert "brightness_temp" in lc2.lightcones
+    assert "not_a_lightcone" not in lc2.lightcones
+    assert all(v is None for v in lc2.lightcones._data.values())
+
+    np.testing.assert_allclose(lc2.brightness_temp, lc.brightness_temp)
+    assert lc2.lightcones._data["brightness_temp"] is not None
+
+
+def test_lightcone_save_over_read_file(test_direc, lc):
+    fname = lc.save(test_direc / "resaved_lightcone.h5")
+    lc2 = LightCone.read(fname)
+
+    # Overwriting the file the lightcones are lazily read from must not lose them.
+    lc2.save(fname, clobber=True)
+    lc3 = LightCone.read(fname)
+
+    assert lc3 == lc
+    np.testing.assert_allclose(lc3.brightness_temp, lc.brightness_temp)
+
+
 def test_lightcone_io_abspath(lc, test_direc):
     lc.save(test_direc / "abs_path_lightcone.h5")
     assert (test_direc / "abs_path_lightcone.h5").exists()
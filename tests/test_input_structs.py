@@ -60,8 +60,9 @@ def test_bad_construction(c):
 def test_constructed_from_itself(c):
     c3 = CosmoParams.new(c)
 
+    # Input structs are immutable, so they are not copied.
     assert c == c3
-    assert c is not c3
+    assert c is c3
 
 
 def test_altered_construction(c):
@@ -173,6 +174,26 @@ def test_validation():
         )
 
 
+def test_validation_warnings_once_per_location():
+    kw = {
+        "astro_params": AstroParams(R_BUBBLE_MAX=15),
+        "flag_options": FlagOptions(USE_EXP_FILTER=False, INHOMO_RECO=True),
+        "user_params": UserParams(BOX_LEN=50),
+        "random_seed": 1,
+    }
+
+    # Under the default filter, a validation warning is only shown once...
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("default")
+        InputParameters(**kw)
+        InputParameters(**kw)
+    assert sum("INHOMO_RECO" in str(w.message) for w in caught) == 1
+
+    # ...but a validation that warned is not cached, so it can warn again.
+    with pytest.warns(UserWarning, match="INHOMO_RECO"):
+        InputParameters(**kw)
+
+
 def test_user_params():
     up = UserParams()
     up_non_cubic = UserParams(NON_CUBIC_FACTOR=1.5)
@@ -282,3 +282,17 @@ def test_validation_options_angular(equal_z_angle):
             user_params=UserParams(KEEP_3D_VELOCITIES=False),
             flag_options=FlagOptions(APPLY_RSDS=False),
         )
+
+
+def test_lc_redshifts_from_distances(equal_cdist):
+    expected = [
+        z_at_value(equal_cdist.cosmo.comoving_distance, d).value
+        for d in equal_cdist.lc_distances
+    ]
+    np.testing.assert_allclose(equal_cdist.lc_redshifts, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize("distance", [np.nan, 1e5])
+def test_redshifts_at_bad_distances(distance):
+    with pytest.raises(ValueError):
+        lcn._redshifts_at_distances(Planck18, np.array([1000.0, distance]))
@@ -0,0 +1,14 @@
+"""Tests of the in-memory FIFO cache."""
+
+from py21cmfast._memo import FIFOCache
+
+
+def test_fifo_cache_drops_oldest():
+    cache = FIFOCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 3  # updating a key doesn't drop anything
+    assert cache == {"a": 3, "b": 2}
+
+    cache["c"] = 4
+    assert cache == {"b": 2, "c": 4}
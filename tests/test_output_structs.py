@@ -84,6 +84,16 @@ def test_pickleability(default_input_struct):
     assert repr(ic_) == repr(ic2)
 
 
+def test_pickleability_computed(ic: InitialConditions):
+    ic2 = pickle.loads(pickle.dumps(ic))
+
+    assert ic2 == ic
+    np.testing.assert_allclose(ic2.lowres_density, ic.lowres_density)
+
+    # The unpickled instance gets its own C struct, pointing to its own arrays.
+    assert ic2() is not ic()
+
+
 def test_fname(default_input_struct):
     ic1 = InitialConditions(inputs=default_input_struct)
     ic2 = InitialConditions(inputs=default_input_struct.clone(random_seed=2))
@@ -148,3 +158,26 @@ def test_reading_purged(ic: InitialConditions):
     assert np.allclose(lowres_density_2, lowres_density)
 
     ic.load_all()
+
+
+def test_reading_mmapped(ic: InitialConditions):
+    lowres_density = ic.lowres_density.copy()
+
+    ic.purge()
+    ic.read(fname=ic.path, keys=["lowres_density"], mmap=True)
+
+    assert isinstance(ic.lowres_density, np.memmap)
+    assert ic._array_state["lowres_density"].computed_in_mem
+    assert np.allclose(ic.lowres_density, lowres_density)
+
+    ic.load_all()
+
+
+def test_is_cached(ic: InitialConditions):
+    # The ic fixture is written to disk, so it can all be purged safely.
+    assert ic.is_cached
+
+    ic.purge()
+    assert ic.is_cached
+
+    ic.load_all()